@@ -39,6 +39,7 @@ class P115Disk(_PluginBase):
     _disk_name = None
     _p115_api = None
     _cookie = None
+    _token_refresh_ratio = 0.7
 
     def __init__(self):
         """
@@ -65,10 +66,24 @@ class P115Disk(_PluginBase):
 
             self._enabled = config.get("enabled")
             self._cookie = config.get("cookie")
+            try:
+                self._token_refresh_ratio = min(
+                    max(float(config.get("token_refresh_ratio") or 0.7), 0.1), 0.9
+                )
+            except (TypeError, ValueError):
+                self._token_refresh_ratio = 0.7
 
             try:
+                if self._p115_api:
+                    self._p115_api.stop()
                 self._client = P115Client(cookies=self._cookie)
-                self._p115_api = P115Api(client=self._client, disk_name=self._disk_name)
+                self._p115_api = P115Api(
+                    client=self._client,
+                    disk_name=self._disk_name,
+                    token_refresh_ratio=self._token_refresh_ratio,
+                )
+                if self._enabled:
+                    self._p115_api.warmup()
             except Exception as e:
                 logger.error(f"115 网盘客户端创建失败: {e}")
 
@@ -133,6 +148,22 @@ class P115Disk(_PluginBase):
                                     }
                                 ],
                             },
+                            {
+                                "component": "VCol",
+                                "props": {"cols": 12, "md": 4},
+                                "content": [
+                                    {
+                                        "component": "VTextField",
+                                        "props": {
+                                            "model": "token_refresh_ratio",
+                                            "label": "OSS 凭证刷新比例",
+                                            "type": "number",
+                                            "hint": "凭证有效期消耗到该比例时提前刷新，范围 0.1-0.9",
+                                            "persistent-hint": True,
+                                        },
+                                    }
+                                ],
+                            },
                         ],
                     },
                     {
@@ -174,6 +205,7 @@ class P115Disk(_PluginBase):
         ], {
             "enabled": False,
             "cookie": "",
+            "token_refresh_ratio": 0.7,
         }
 
     def get_page(self) -> List[dict]:
@@ -260,9 +292,10 @@ class P115Disk(_PluginBase):
             return None
 
         if recursion:
-            result = self._p115_api.iter_files(fileitem)
-            if result is not None:
-                return result
+            try:
+                return list(self._p115_api.iter_files(fileitem))
+            except Exception as e:
+                logger.error(f"【P115Disk】批量遍历目录失败，回退逐级查询: {e}")
 
         def __get_files(_item: FileItem, _r: Optional[bool] = False):
             """
@@ -492,8 +525,7 @@ class P115Disk(_PluginBase):
                     "msg": "插件未启用或未初始化",
                 }
 
-            self._p115_api._id_cache.clear()
-            self._p115_api._id_item_cache.clear()
+            self._p115_api._item_store.clear()
 
             logger.info("【P115Disk】缓存清理成功")
             return {
@@ -511,4 +543,5 @@ class P115Disk(_PluginBase):
         """
         退出插件
         """
-        pass
+        if self._p115_api:
+            self._p115_api.stop()
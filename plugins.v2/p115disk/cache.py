@@ -144,3 +144,92 @@ class ItemIdCache:
         清空所有缓存
         """
         self.id_to_item.clear()
+
+
+class ItemStore:
+    """
+    文件缓存统一入口，同时维护路径ID缓存与文件详情ID缓存
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        初始化文件缓存
+
+        :param maxsize: 缓存最大大小，默认128
+        """
+        self.id_cache = IdPathCache(maxsize=maxsize)
+        self.item_cache = ItemIdCache(maxsize=maxsize)
+
+    def add(
+        self,
+        id: int,
+        path: str,
+        size: Optional[int],
+        modify_time: Optional[int],
+        pickcode: Optional[str],
+        is_dir: bool,
+    ):
+        """
+        同时写入路径ID缓存与文件详情缓存
+
+        :param id: 文件 ID
+        :param path: 文件或目录路径，目录不带末尾斜杠
+        :param size: 文件大小
+        :param modify_time: 修改时间
+        :param pickcode: 提取码
+        :param is_dir: 是否为目录
+        """
+        self.id_cache.add_cache(id=id, directory=path)
+        self.item_cache.add_cache(
+            id=id,
+            item={
+                "path": path,
+                "id": id,
+                "size": size,
+                "modify_time": modify_time,
+                "pickcode": pickcode,
+                "is_dir": is_dir,
+            },
+        )
+
+    def get_by_path(self, path: str) -> Optional[dict]:
+        """
+        通过路径获取文件详情
+
+        :param path: 文件或目录路径
+        :return: 文件详情，如果不存在则返回 None
+        """
+        _id = self.id_cache.get_id_by_dir(path)
+        if not _id:
+            return None
+        return self.item_cache.get_item(_id)
+
+    def relocate(self, id: int, new_path: str):
+        """
+        文件移动或重命名后，一次性更新两份缓存中的路径
+
+        :param id: 文件 ID
+        :param new_path: 新的文件或目录路径
+        """
+        # add_cache 会自动清理旧路径映射，无需先删除
+        if self.id_cache.get_dir_by_id(id):
+            self.id_cache.add_cache(id=id, directory=new_path)
+        item = self.item_cache.get_item(id)
+        if item:
+            self.item_cache.add_cache(id=id, item={**item, "path": new_path})
+
+    def remove(self, id: int):
+        """
+        同时删除路径ID缓存与文件详情缓存
+
+        :param id: 文件 ID
+        """
+        self.id_cache.remove(id=id)
+        self.item_cache.remove(id)
+
+    def clear(self):
+        """
+        清空所有缓存
+        """
+        self.id_cache.clear()
+        self.item_cache.clear()
@@ -1,11 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from hashlib import sha1
+from mmap import mmap, ACCESS_READ, PAGESIZE
+from os import fstat
+from os.path import splitext
 from pathlib import Path
-from time import time, monotonic, sleep
-from typing import Optional, List, Dict, Tuple
-from datetime import datetime, timezone
+from threading import Lock, RLock, Thread, Timer
+from time import monotonic, time, sleep
+from typing import Optional, Iterator, List, Dict, Tuple
 
-from cryptography.hazmat.primitives import hashes
+try:
+    from mmap import MADV_SEQUENTIAL, MADV_WILLNEED
+except ImportError:
+    MADV_SEQUENTIAL = MADV_WILLNEED = None
+
+from cachetools import TTLCache
 from httpx import stream, RequestError
-from oss2 import SizedFileAdapter, determine_part_size, StsAuth, Bucket
+from oss2 import determine_part_size, StsAuth, Bucket, Session as OssSession
 from oss2.models import PartInfo
 from oss2.utils import b64encode_as_string
 from oss2.exceptions import ServerError
@@ -20,8 +31,19 @@ from app.log import logger
 from app.modules.filemanager.storages import transfer_process
 from app.schemas import FileItem, StorageUsage
 
-from .cache import IdPathCache, ItemIdCache
-from .tools import RateLimiter, get_ios_ua_app
+from .cache import IdPathCache, ItemIdCache, ItemStore
+from .tools import TokenBucket, get_ios_ua_app, read_range
+
+
+# OSS 分片并发上传线程数，过高容易触发 115 风控
+OSS_UPLOAD_MAX_WORKERS = 4
+# OSS 分片大小上下限，并发时每个线程会持有一个分片的数据
+OSS_PART_SIZE_MIN = 10 * 1024 * 1024
+OSS_PART_SIZE_MAX = 64 * 1024 * 1024
+# OSS 凭证有效期消耗到该比例时提前刷新
+OSS_TOKEN_REFRESH_RATIO = 0.7
+# OSS 凭证距离过期的最小安全余量（秒）
+OSS_TOKEN_MIN_MARGIN = 30
 
 
 class P115Api:
@@ -29,18 +51,29 @@ class P115Api:
     115 网盘基础操作类
     """
 
-    def __init__(self, client: P115Client, disk_name: str):
+    def __init__(
+        self,
+        client: P115Client,
+        disk_name: str,
+        token_refresh_ratio: float = OSS_TOKEN_REFRESH_RATIO,
+    ):
         """
         初始化 115 网盘 API
 
         :param client: 115 网盘客户端实例
         :param disk_name: 网盘名称
+        :param token_refresh_ratio: OSS 凭证有效期消耗到该比例时提前刷新，默认0.7
         """
         self.client = client
         self._disk_name = disk_name
-        self._id_cache: IdPathCache = IdPathCache(maxsize=4096)
-        self._id_item_cache: ItemIdCache = ItemIdCache(maxsize=4096)
+        self._token_refresh_ratio = token_refresh_ratio
+        # 官方 u115 存储链，接口异常时回退使用
+        self._storage_chain = StorageChain()
+        self._item_store: ItemStore = ItemStore(maxsize=4096)
+        self._id_cache: IdPathCache = self._item_store.id_cache
+        self._id_item_cache: ItemIdCache = self._item_store.item_cache
         self.transtype = {"move": "移动", "copy": "复制"}
+        self._transtype_set = frozenset(self.transtype)
 
         self._rename_call_counter = 0
         self._copy_call_counter = 0
@@ -48,24 +81,28 @@ class P115Api:
         self._delete_call_counter = 0
         self._get_pid_by_path_call_counter = 0
 
-        self._get_item_rate_limiter = RateLimiter(
-            max_calls=2, time_window=2.0, name="get_item"
-        )
-        self._delete_rate_limiter = RateLimiter(
-            max_calls=1, time_window=2.0, name="delete"
-        )
-        self._get_pid_by_path_rate_limiter = RateLimiter(
-            max_calls=1, time_window=1.0, name="get_pid_by_path"
+        self._get_item_rate_limiter = TokenBucket(
+            capacity=2, rate=1.0, name="get_item"
         )
-        self._rename_rate_limiter = RateLimiter(
-            max_calls=1, time_window=2.0, name="rename"
+        self._delete_rate_limiter = TokenBucket(capacity=1, rate=0.5, name="delete")
+        self._get_pid_by_path_rate_limiter = TokenBucket(
+            capacity=1, rate=1.0, name="get_pid_by_path"
         )
-        self._move_rate_limiter = RateLimiter(max_calls=1, time_window=2.0, name="move")
-        self._copy_rate_limiter = RateLimiter(max_calls=1, time_window=2.0, name="copy")
-        self._list_rate_limiter = RateLimiter(max_calls=1, time_window=2.0, name="list")
-
-        self._get_item_fail_records: Dict[str, Dict[str, float]] = {}
-        self._get_item_blacklist: Dict[str, float] = {}
+        self._rename_rate_limiter = TokenBucket(capacity=1, rate=0.5, name="rename")
+        self._move_rate_limiter = TokenBucket(capacity=1, rate=0.5, name="move")
+        self._copy_rate_limiter = TokenBucket(capacity=1, rate=0.5, name="copy")
+        self._list_rate_limiter = TokenBucket(capacity=1, rate=0.5, name="list")
+
+        self._oss_token_cache: Optional[Tuple[str, str, str, str, datetime]] = None
+        self._oss_token_issued_at: Optional[datetime] = None
+        self._oss_token_lock = RLock()
+        self._oss_token_timer: Optional[Timer] = None
+        self._active_uploads = 0
+        # 所有上传共用的 OSS 连接池，避免每个文件重新建立连接
+        self._oss_session = OssSession(pool_size=16)
+
+        self._get_item_fail_records: TTLCache = TTLCache(maxsize=4096, ttl=10)
+        self._get_item_blacklist: TTLCache = TTLCache(maxsize=4096, ttl=15)
 
     def get_pid_by_path(self, path: Path) -> int:
         """
@@ -73,12 +110,22 @@ class P115Api:
 
         :param path: 文件夹路径
 
+        :return: 目录 ID
+        """
+        return self._get_pid_by_str(path.as_posix())
+
+    def _get_pid_by_str(self, path_str: str) -> int:
+        """
+        通过文件夹路径字符串获取文件夹 ID
+
+        :param path_str: 文件夹路径（POSIX 格式，不带结尾斜杠）
+
         :return: 目录 ID
         """
         try:
-            if path.as_posix() == "/":
+            if path_str == "/":
                 return 0
-            pid = self._id_cache.get_id_by_dir(directory=path.as_posix())
+            pid = self._id_cache.get_id_by_dir(directory=path_str)
             if pid:
                 return pid
             self._get_pid_by_path_rate_limiter.acquire()
@@ -86,54 +133,55 @@ class P115Api:
                 self._get_pid_by_path_call_counter + 1
             ) % 2
             if self._get_pid_by_path_call_counter == 0:
-                resp = self.client.fs_dir_getid(
-                    path.as_posix(), **get_ios_ua_app(app=False)
-                )
+                resp = self.client.fs_dir_getid(path_str, **get_ios_ua_app(app=False))
             else:
-                resp = self.client.fs_dir_getid_app(path.as_posix(), **get_ios_ua_app())
+                resp = self.client.fs_dir_getid_app(path_str, **get_ios_ua_app())
             check_response(resp)
             pid = resp.get("id", -1)
             if pid == 0:
-                resp = self.client.fs_makedirs_app(
-                    path.as_posix(), pid=0, **get_ios_ua_app()
-                )
+                resp = self.client.fs_makedirs_app(path_str, pid=0, **get_ios_ua_app())
                 check_response(resp)
                 pid = resp["cid"]
-                self._id_cache.add_cache(id=int(pid), directory=path.as_posix())
+                self._id_cache.add_cache(id=int(pid), directory=path_str)
                 return pid
-            if pid != 0:
+            if pid != -1:
+                # 写入路径ID缓存，批量复制、移动到同一目录时无需重复查询
+                self._id_cache.add_cache(id=int(pid), directory=path_str)
                 return pid
             return -1
         except Exception as e:
             logger.warn(f"【P115Disk】获取文件夹ID失败: {str(e)}")
-            file_item = self.get_item(path)
+            file_item = self.get_item(Path(path_str))
             if file_item:
                 return int(file_item.fileid)
             return -1
 
-    def iter_files(self, fileitem: FileItem) -> Optional[List[FileItem]]:
+    def iter_files(self, fileitem: FileItem) -> Iterator[FileItem]:
         """
-        递归遍历文件夹
+        递归遍历文件夹，边遍历边写入缓存并逐项返回
 
         :param fileitem: 文件项，可以是文件或目录
 
-        :return: 文件项列表
+        :return: 文件项迭代器
+        :raises Exception: 遍历接口调用失败时抛出
         """
         if fileitem.type == "file":
             item = self.detail(fileitem)
             if item:
-                return [item]
-            return []
+                yield item
+            return
         if fileitem.path == "/":
             file_id = "0"
         else:
             file_id = fileitem.fileid
             if not file_id:
-                file_id = self.get_pid_by_path(Path(fileitem.path))
+                file_id = self._get_pid_by_str(fileitem.path.rstrip("/") or "/")
             if file_id == -1:
-                return []
+                return
 
-        items = []
+        # 循环内高频访问的属性预先绑定为局部变量
+        add_cache = self._item_store.add
+        disk_name = self._disk_name
         try:
             for item in iter_files_with_path_skim(
                 client=self.client,
@@ -141,39 +189,35 @@ class P115Api:
                 with_ancestors=False,
                 **get_ios_ua_app(),
             ):
-                file_path = item["path"] + ("/" if item["is_dir"] else "")
-                self._id_cache.add_cache(id=item["id"], directory=item["path"])
-                self._id_item_cache.add_cache(
+                name = item["name"]
+                is_dir = item["is_dir"]
+                basename, extension = splitext(name)
+                extension = None if is_dir else extension[1:]
+                file_path = item["path"] + ("/" if is_dir else "")
+                add_cache(
                     id=item["id"],
-                    item={
-                        "path": file_path,
-                        "id": item["id"],
-                        "size": item["size"],
-                        "modify_time": None,
-                        "pickcode": item["pickcode"],
-                        "is_dir": item["is_dir"],
-                    },
+                    path=item["path"],
+                    size=item["size"],
+                    modify_time=None,
+                    pickcode=item["pickcode"],
+                    is_dir=is_dir,
                 )
-                items.append(
-                    FileItem(
-                        storage=self._disk_name,
-                        fileid=str(item["id"]),
-                        parent_fileid=str(item["parent_id"]),
-                        name=item["name"],
-                        basename=Path(item["name"]).stem,
-                        extension=Path(item["name"]).suffix[1:]
-                        if not item["is_dir"]
-                        else None,
-                        type="dir" if item["is_dir"] else "file",
-                        path=file_path,
-                        size=item["size"] if not item["is_dir"] else None,
-                        modify_time=None,
-                        pickcode=item["pickcode"],
-                    )
+                yield FileItem(
+                    storage=disk_name,
+                    fileid=str(item["id"]),
+                    parent_fileid=str(item["parent_id"]),
+                    name=name,
+                    basename=basename,
+                    extension=extension,
+                    type="dir" if is_dir else "file",
+                    path=file_path,
+                    size=None if is_dir else item["size"],
+                    modify_time=None,
+                    pickcode=item["pickcode"],
                 )
         except Exception as e:
             logger.warn(f"【P115Disk】递归遍历文件夹失败: {str(e)}")
-            return None
+            raise
 
     def list(self, fileitem: FileItem) -> List[FileItem]:
         """
@@ -194,45 +238,48 @@ class P115Api:
         else:
             file_id = fileitem.fileid
             if not file_id:
-                file_id = self.get_pid_by_path(Path(fileitem.path))
+                file_id = self._get_pid_by_str(fileitem.path.rstrip("/") or "/")
             if file_id == -1:
                 return []
 
         items = []
+        # 循环内高频访问的属性预先绑定为局部变量
+        add_cache = self._item_store.add
+        append_item = items.append
+        disk_name = self._disk_name
+        parent_path = fileitem.path
         try:
             for data in iter_fs_files(
                 self.client, file_id, cooldown=1.5, **get_ios_ua_app(app=False)
             ):
-                logger.debug(f"【P115Disk】浏览目录 {data}")
+                logger.debug("【P115Disk】浏览目录 %s", data)
                 for item in data.get("data", []):
                     item = normalize_attr(item)
-                    path = f"{fileitem.path}{item['name']}"
-                    file_path = path + ("/" if item["is_dir"] else "")
-                    self._id_cache.add_cache(id=item["id"], directory=path)
-                    self._id_item_cache.add_cache(
+                    name = item["name"]
+                    is_dir = item["is_dir"]
+                    basename, extension = splitext(name)
+                    extension = None if is_dir else extension[1:]
+                    path = f"{parent_path}{name}"
+                    file_path = path + ("/" if is_dir else "")
+                    add_cache(
                         id=item["id"],
-                        item={
-                            "path": file_path,
-                            "id": item["id"],
-                            "size": item["size"],
-                            "modify_time": item["ctime"],
-                            "pickcode": item["pickcode"],
-                            "is_dir": item["is_dir"],
-                        },
+                        path=path,
+                        size=item["size"],
+                        modify_time=item["ctime"],
+                        pickcode=item["pickcode"],
+                        is_dir=is_dir,
                     )
-                    items.append(
+                    append_item(
                         FileItem(
-                            storage=self._disk_name,
+                            storage=disk_name,
                             fileid=str(item["id"]),
                             parent_fileid=str(item["parent_id"]),
-                            name=item["name"],
-                            basename=Path(item["name"]).stem,
-                            extension=Path(item["name"]).suffix[1:]
-                            if not item["is_dir"]
-                            else None,
-                            type="dir" if item["is_dir"] else "file",
+                            name=name,
+                            basename=basename,
+                            extension=extension,
+                            type="dir" if is_dir else "file",
                             path=file_path,
-                            size=item["size"] if not item["is_dir"] else None,
+                            size=None if is_dir else item["size"],
                             modify_time=item["ctime"],
                             pickcode=item["pickcode"],
                         )
@@ -240,31 +287,24 @@ class P115Api:
         except Exception as e:
             logger.warn(f"【P115Disk】获取信息失败: {str(e)}")
             try:
-                storage_chain = StorageChain()
                 fileitem = FileItem(
                     storage="u115",
                     **fileitem.model_dump(exclude={"storage"}),
                 )
-                fallback_items = storage_chain.list_files(
+                fallback_items = self._storage_chain.list_files(
                     fileitem=fileitem, recursion=False
                 )
                 if fallback_items:
                     result_items = []
                     for item in fallback_items:
                         if item.fileid:
-                            self._id_cache.add_cache(
-                                id=int(item.fileid), directory=item.path.rstrip("/")
-                            )
-                            self._id_item_cache.add_cache(
+                            self._item_store.add(
                                 id=int(item.fileid),
-                                item={
-                                    "path": item.path,
-                                    "id": int(item.fileid),
-                                    "size": item.size,
-                                    "modify_time": item.modify_time,
-                                    "pickcode": item.pickcode,
-                                    "is_dir": bool(item.type == "dir"),
-                                },
+                                path=item.path.rstrip("/"),
+                                size=item.size,
+                                modify_time=item.modify_time,
+                                pickcode=item.pickcode,
+                                is_dir=bool(item.type == "dir"),
                             )
                         result_item = FileItem(
                             storage=self._disk_name,
@@ -288,7 +328,7 @@ class P115Api:
         """
         try:
             new_path = Path(fileitem.path) / name
-            parent_id = self.get_pid_by_path(Path(fileitem.path))
+            parent_id = self._get_pid_by_str(fileitem.path.rstrip("/") or "/")
             if parent_id == -1:
                 return None
             payload = {
@@ -302,18 +342,14 @@ class P115Api:
             if not data:
                 logger.error(f"【P115Disk】创建目录失败: {resp}")
                 return None
-            self._id_cache.add_cache(id=data, directory=new_path.as_posix())
             modify_time = int(time())
-            self._id_item_cache.add_cache(
+            self._item_store.add(
                 id=data,
-                item={
-                    "path": new_path.as_posix(),
-                    "id": data,
-                    "size": None,
-                    "modify_time": modify_time,
-                    "pickcode": self.client.to_pickcode(data),
-                    "is_dir": True,
-                },
+                path=new_path.as_posix(),
+                size=None,
+                modify_time=modify_time,
+                pickcode=self.client.to_pickcode(data),
+                is_dir=True,
             )
             return FileItem(
                 storage=self._disk_name,
@@ -347,18 +383,14 @@ class P115Api:
             )
             check_response(resp)
             logger.info(f"【P115Disk】创建目录: {resp}")
-            self._id_cache.add_cache(id=int(resp["cid"]), directory=path.as_posix())
             modify_time = int(time())
-            self._id_item_cache.add_cache(
-                id=resp["cid"],
-                item={
-                    "path": path.as_posix(),
-                    "id": resp["cid"],
-                    "size": None,
-                    "modify_time": modify_time,
-                    "pickcode": self.client.to_pickcode(resp["cid"]),
-                    "is_dir": True,
-                },
+            self._item_store.add(
+                id=int(resp["cid"]),
+                path=path.as_posix(),
+                size=None,
+                modify_time=modify_time,
+                pickcode=self.client.to_pickcode(resp["cid"]),
+                is_dir=True,
             )
             return FileItem(
                 storage=self._disk_name,
@@ -384,79 +416,49 @@ class P115Api:
         :return: 文件项，如果不存在则返回None
         """
         path_str = path.as_posix()
-        now = monotonic()
 
         if path_str in self._get_item_blacklist:
-            if now < self._get_item_blacklist[path_str]:
-                return None
-            else:
-                del self._get_item_blacklist[path_str]
+            return None
 
         id = self._id_cache.get_id_by_dir(path_str)
         if id:
             item = self._id_item_cache.get_item(id)
             if item:
-                if path_str in self._get_item_fail_records:
-                    del self._get_item_fail_records[path_str]
-                logger.debug(f"【P115Disk】缓存获取: {item}")
-                path = Path(item["path"])
-                if item["is_dir"]:
-                    return FileItem(
-                        storage=self._disk_name,
-                        fileid=str(item["id"]),
-                        path=path.as_posix() + "/",
-                        name=path.name,
-                        basename=path.name,
-                        type="dir",
-                        modify_time=item["modify_time"],
-                        pickcode=item["pickcode"],
-                    )
-                else:
-                    return FileItem(
-                        storage=self._disk_name,
-                        fileid=str(item["id"]),
-                        parent_fileid=None,
-                        name=path.name,
-                        basename=path.stem,
-                        extension=path.suffix[1:],
-                        type="file",
-                        path=path.as_posix(),
-                        size=item["size"],
-                        modify_time=item["modify_time"],
-                        pickcode=item["pickcode"],
-                    )
+                self._get_item_fail_records.pop(path_str, None)
+                logger.debug("【P115Disk】缓存获取: %s", item)
+                return self._cache_item_to_fileitem(item)
 
         self._get_item_rate_limiter.acquire()
 
         try:
-            try:
-                file_id = get_id_to_path(
-                    client=self.client, path=path_str, **get_ios_ua_app(app=False)
-                )
-            except KeyError:
-                file_id = get_id_to_path(
-                    client=self.client,
-                    path=path_str,
-                    refresh=True,
-                    **get_ios_ua_app(app=False),
+            file_item = None
+            if id:
+                # 路径 ID 已缓存但详情缺失时，直接按 ID 获取详情，省去一次路径解析请求
+                file_item = self._get_attr_by_cached_id(id, path)
+            if file_item is None:
+                try:
+                    file_id = get_id_to_path(
+                        client=self.client, path=path_str, **get_ios_ua_app(app=False)
+                    )
+                except KeyError:
+                    file_id = get_id_to_path(
+                        client=self.client,
+                        path=path_str,
+                        refresh=True,
+                        **get_ios_ua_app(app=False),
+                    )
+                file_item = get_attr(
+                    client=self.client, id=file_id, **get_ios_ua_app(app=False)
                 )
-            file_item = get_attr(
-                client=self.client, id=file_id, **get_ios_ua_app(app=False)
-            )
-            logger.debug(f"【P115Disk】文件信息: {file_item}")
-            if path_str in self._get_item_fail_records:
-                del self._get_item_fail_records[path_str]
-            self._id_cache.add_cache(id=file_item["id"], directory=path_str)
-            self._id_item_cache.add_cache(
+            logger.debug("【P115Disk】文件信息: %s", file_item)
+            self._get_item_fail_records.pop(path_str, None)
+            self._item_store.add(
                 id=file_item["id"],
-                item={
-                    "path": path_str,
-                    "id": file_item["id"],
-                    "size": file_item["size"],
-                    "modify_time": file_item["mtime"],
-                    "pickcode": file_item["pickcode"],
-                    "is_dir": file_item["is_dir"],
-                },
+                path=path_str,
+                size=file_item["size"],
+                modify_time=file_item["mtime"],
+                pickcode=file_item["pickcode"],
+                is_dir=file_item["is_dir"],
             )
             if file_item["is_dir"]:
                 return FileItem(
@@ -471,13 +473,14 @@ class P115Api:
                     pickcode=file_item["pickcode"],
                 )
             else:
+                basename, extension = splitext(file_item["name"])
                 return FileItem(
                     storage=self._disk_name,
                     fileid=str(file_item["id"]),
                     parent_fileid=str(file_item["parent_id"]),
                     name=file_item["name"],
-                    basename=path.stem,
-                    extension=path.suffix[1:],
+                    basename=basename,
+                    extension=extension[1:],
                     type="file",
                     path=path_str,
                     size=file_item["size"],
@@ -485,54 +488,102 @@ class P115Api:
                     pickcode=file_item["pickcode"],
                 )
         except FileNotFoundError:
-            self._record_get_item_failure(path_str, now)
+            self._record_get_item_failure(path_str)
             return None
         except Exception:
-            storage_chain = StorageChain()
-            file_item = storage_chain.get_file_item(storage="u115", path=path)
+            file_item = self._storage_chain.get_file_item(storage="u115", path=path)
             if file_item:
-                if path_str in self._get_item_fail_records:
-                    del self._get_item_fail_records[path_str]
-                self._id_cache.add_cache(id=int(file_item.fileid), directory=path_str)
-                self._id_item_cache.add_cache(
+                self._get_item_fail_records.pop(path_str, None)
+                self._item_store.add(
                     id=int(file_item.fileid),
-                    item={
-                        "path": path_str,
-                        "id": int(file_item.fileid),
-                        "size": file_item.size,
-                        "modify_time": file_item.modify_time,
-                        "pickcode": file_item.pickcode,
-                        "is_dir": bool(file_item.type == "dir"),
-                    },
+                    path=path_str,
+                    size=file_item.size,
+                    modify_time=file_item.modify_time,
+                    pickcode=file_item.pickcode,
+                    is_dir=bool(file_item.type == "dir"),
                 )
             else:
-                self._record_get_item_failure(path_str, now)
+                self._record_get_item_failure(path_str)
                 return None
             file_item = FileItem(
                 storage=self._disk_name, **file_item.model_dump(exclude={"storage"})
             )
             return file_item
 
-    def _record_get_item_failure(self, path_str: str, now: float):
+    def _cache_item_to_fileitem(self, item: Dict) -> FileItem:
         """
-        记录 get_item 失败，如果连续失败3次则加入黑名单15秒
+        将文件详情缓存转换为文件项
 
-        :param path_str: 目录路径
-        :param now: 当前时间戳
+        :param item: 文件详情缓存
+
+        :return: 文件项
+        """
+        path = Path(item["path"])
+        basename, extension = splitext(path.name)
+        if item["is_dir"]:
+            return FileItem(
+                storage=self._disk_name,
+                fileid=str(item["id"]),
+                path=path.as_posix() + "/",
+                name=path.name,
+                basename=path.name,
+                type="dir",
+                modify_time=item["modify_time"],
+                pickcode=item["pickcode"],
+            )
+        return FileItem(
+            storage=self._disk_name,
+            fileid=str(item["id"]),
+            parent_fileid=None,
+            name=path.name,
+            basename=basename,
+            extension=extension[1:],
+            type="file",
+            path=path.as_posix(),
+            size=item["size"],
+            modify_time=item["modify_time"],
+            pickcode=item["pickcode"],
+        )
+
+    def _get_attr_by_cached_id(self, id: int, path: Path) -> Optional[Dict]:
         """
-        if path_str not in self._get_item_fail_records:
-            self._get_item_fail_records[path_str] = {"count": 0, "first_fail_time": now}
+        通过缓存的 ID 直接获取文件详情
+        缓存失效（文件不存在、名称不符或已移动到其它目录）时移除该 ID 缓存并返回 None
+
+        :param id: 缓存中的文件 ID
+        :param path: 期望的文件路径
+
+        :return: 文件详情，缓存失效或无法校验时返回None
+        """
+        parent_id = self._id_cache.get_id_by_dir(path.parent.as_posix())
+        if not parent_id:
+            # 父目录 ID 未缓存，无法校验文件是否已移动，交由路径查询
+            return None
+        try:
+            file_item = get_attr(client=self.client, id=id, **get_ios_ua_app(app=False))
+        except FileNotFoundError:
+            self._id_cache.remove(id=id)
+            return None
+        if file_item.get("name") != path.name or int(
+            file_item.get("parent_id", -1)
+        ) != int(parent_id):
+            self._id_cache.remove(id=id)
+            return None
+        return file_item
 
-        record = self._get_item_fail_records[path_str]
-        if now - record["first_fail_time"] > 10:
-            record["count"] = 0
-            record["first_fail_time"] = now
+    def _record_get_item_failure(self, path_str: str):
+        """
+        记录 get_item 失败，10秒内连续失败3次则加入黑名单15秒
+        失败记录与黑名单均由 TTLCache 自动过期
 
-        record["count"] += 1
+        :param path_str: 目录路径
+        """
+        record = self._get_item_fail_records.setdefault(path_str, [0])
+        record[0] += 1
 
-        if record["count"] >= 3:
-            self._get_item_blacklist[path_str] = now + 15.0
-            del self._get_item_fail_records[path_str]
+        if record[0] >= 3:
+            self._get_item_blacklist[path_str] = True
+            self._get_item_fail_records.pop(path_str, None)
 
     def get_parent(self, fileitem: FileItem) -> Optional[FileItem]:
         """
@@ -565,20 +616,17 @@ class P115Api:
                 resp = self.client.fs_delete_app(fileitem.fileid, **get_ios_ua_app())
             check_response(resp)
             logger.info(f"【P115Disk】删除文件: {resp}")
-            self._id_cache.remove(id=int(fileitem.fileid))
-            self._id_item_cache.remove(int(fileitem.fileid))
+            self._item_store.remove(int(fileitem.fileid))
             return True
         except Exception as e:
             logger.warn(f"【P115Disk】删除文件错误: {e}")
-            storage_chain = StorageChain()
             fileitem = FileItem(
                 storage="u115",
                 **fileitem.model_dump(exclude={"storage"}),
             )
-            resp = storage_chain.delete_file(fileitem=fileitem)
+            resp = self._storage_chain.delete_file(fileitem=fileitem)
             if resp:
-                self._id_cache.remove(id=int(fileitem.fileid))
-                self._id_item_cache.remove(int(fileitem.fileid))
+                self._item_store.remove(int(fileitem.fileid))
             return resp
 
     def rename(self, fileitem: FileItem, name: str) -> bool:
@@ -603,27 +651,14 @@ class P115Api:
                 )
             check_response(resp)
 
-            old_cache_path = self._id_cache.get_dir_by_id(int(fileitem.fileid))
+            file_id = int(fileitem.fileid)
+            old_cache_path = self._id_cache.get_dir_by_id(file_id)
+            if not old_cache_path:
+                old_cache_item = self._id_item_cache.get_item(file_id)
+                old_cache_path = old_cache_item["path"] if old_cache_item else None
             if old_cache_path:
-                self._id_cache.remove(id=int(fileitem.fileid))
-                new_path = Path(old_cache_path).parent / name
-                self._id_cache.add_cache(
-                    id=int(fileitem.fileid),
-                    directory=new_path.as_posix(),
-                )
-            old_cache_item = self._id_item_cache.get_item(int(fileitem.fileid))
-            if old_cache_item:
-                new_path = Path(old_cache_item["path"]).parent / name
-                self._id_item_cache.add_cache(
-                    id=int(fileitem.fileid),
-                    item={
-                        "path": new_path.as_posix(),
-                        "id": old_cache_item["id"],
-                        "size": old_cache_item["size"],
-                        "modify_time": old_cache_item["modify_time"],
-                        "pickcode": old_cache_item["pickcode"],
-                        "is_dir": old_cache_item["is_dir"],
-                    },
+                self._item_store.relocate(
+                    file_id, (Path(old_cache_path).parent / name).as_posix()
                 )
             return True
         except Exception as e:
@@ -661,23 +696,36 @@ class P115Api:
         progress_callback = transfer_process(Path(fileitem.path).as_posix())
 
         try:
+            # 原始字节流不做 Content-Encoding 解码，要求服务端返回未压缩内容
             with stream(
-                "GET", download_url, headers={"user-agent": settings.USER_AGENT}
+                "GET",
+                download_url,
+                headers={
+                    "user-agent": settings.USER_AGENT,
+                    "accept-encoding": "identity",
+                },
             ) as r:
                 r.raise_for_status()
                 downloaded_size = 0
+                last_percent = -1
 
                 with open(local_path, "wb") as f:
-                    for chunk in r.iter_bytes(chunk_size=10 * 1024 * 1024):
-                        if global_vars.is_transfer_stopped(fileitem.path):
+                    write = f.write
+                    # 使用原始字节流，每 8MB 检查一次取消状态，进度仅在整数百分比变化时上报
+                    for index, chunk in enumerate(r.iter_raw(chunk_size=1 << 20)):
+                        if index % 8 == 0 and global_vars.is_transfer_stopped(
+                            fileitem.path
+                        ):
                             logger.info(f"【P115Disk】{fileitem.path} 下载已取消！")
                             r.close()
                             return None
-                        f.write(chunk)
+                        write(chunk)
                         downloaded_size += len(chunk)
                         if file_size:
-                            progress = (downloaded_size * 100) / file_size
-                            progress_callback(progress)
+                            percent = downloaded_size * 100 // file_size
+                            if percent != last_percent:
+                                last_percent = percent
+                                progress_callback(percent)
 
                 # 完成下载
                 progress_callback(100)
@@ -701,15 +749,33 @@ class P115Api:
         计算文件SHA1
         size: 前多少字节
         """
-        sha1 = hashes.Hash(hashes.SHA1())
         with open(filepath, "rb") as f:
-            if size:
-                chunk = f.read(size)
-                sha1.update(chunk)
-            else:
-                while chunk := f.read(8192):
-                    sha1.update(chunk)
-        return sha1.finalize().hex()
+            if not fstat(f.fileno()).st_size:
+                return sha1().hexdigest()
+            try:
+                with mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+                    if MADV_SEQUENTIAL is not None:
+                        mm.madvise(MADV_SEQUENTIAL)
+                    if size:
+                        with memoryview(mm) as mv:
+                            return sha1(mv[:size]).hexdigest()
+                    return sha1(mm).hexdigest()
+            except (OSError, ValueError):
+                # 部分文件系统（如 FUSE、SMB 等网络挂载）不支持 mmap，回退为分块读取
+                f.seek(0)
+                h = sha1()
+                remaining = size or None
+                while remaining is None or remaining > 0:
+                    chunk_size = 1 << 20
+                    if remaining is not None:
+                        chunk_size = min(chunk_size, remaining)
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    h.update(chunk)
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                return h.hexdigest()
 
     def _get_oss_token(self) -> Tuple[str, str, str, str, datetime]:
         """
@@ -727,30 +793,184 @@ class P115Api:
         expiration_str = token_resp.get("Expiration")
 
         # 解析过期时间
-        expiration_time = datetime.fromisoformat(expiration_str.replace("Z", "+00:00"))
+        expiration_time = self._parse_expiration(expiration_str)
 
-        return (
+        self._oss_token_issued_at = datetime.now(timezone.utc)
+        self._oss_token_cache = (
             endpoint,
             access_key_id,
             access_key_secret,
             security_token,
             expiration_time,
         )
+        self._schedule_token_refresh(expiration_time)
+        return self._oss_token_cache
+
+    def _get_cached_oss_token(self) -> Tuple[str, str, str, str, datetime]:
+        """
+        获取 OSS 上传凭证，优先复用未临近过期的缓存凭证
+
+        :return: (endpoint, access_key_id, access_key_secret, security_token, expiration_time)
+        """
+        token = self._oss_token_cache
+        issued_at = self._oss_token_issued_at
+        if (
+            token is None
+            or issued_at is None
+            or self._should_refresh(issued_at, token[4], self._token_refresh_ratio)
+        ):
+            return self._get_oss_token()
+        if self._oss_token_timer is None:
+            self._schedule_token_refresh(token[4])
+        return token
+
+    def _schedule_token_refresh(self, expiration_time: datetime):
+        """
+        按凭证有效期消耗比例安排后台刷新，替换已有的刷新定时器
+
+        :param expiration_time: 凭证过期时间
+        """
+        refresh_at = self._refresh_at(
+            self._oss_token_issued_at or datetime.now(timezone.utc),
+            expiration_time,
+            self._token_refresh_ratio,
+        )
+        delay = (refresh_at - datetime.now(timezone.utc)).total_seconds()
+        with self._oss_token_lock:
+            if self._oss_token_timer is not None:
+                self._oss_token_timer.cancel()
+                self._oss_token_timer = None
+            if delay <= 0:
+                return
+            timer = Timer(delay, self._refresh_oss_token)
+            timer.name = "P115Disk-TokenRefresh"
+            timer.daemon = True
+            self._oss_token_timer = timer
+            timer.start()
+
+    def _refresh_oss_token(self):
+        """
+        后台刷新 OSS 凭证，仅在有上传任务时刷新，空闲时交由下次使用时重新获取
+        """
+        with self._oss_token_lock:
+            self._oss_token_timer = None
+            if not self._active_uploads:
+                return
+        try:
+            _, _, _, _, expiration_time = self._get_oss_token()
+            logger.info(
+                f"【P115Disk】后台刷新 OSS Token 成功，新的过期时间: "
+                f"{expiration_time.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+            )
+        except Exception as e:
+            logger.warn(f"【P115Disk】后台刷新 OSS Token 失败: {e}")
+
+    def stop(self):
+        """
+        停止后台任务
+        """
+        with self._oss_token_lock:
+            if self._oss_token_timer is not None:
+                self._oss_token_timer.cancel()
+                self._oss_token_timer = None
+
+    def warmup(self):
+        """
+        后台预热：预取 OSS 上传凭证，同时提前建立到 115 接口的连接
+        """
+        Thread(target=self._warmup, name="P115Disk-Warmup", daemon=True).start()
+
+    def _warmup(self):
+        """
+        预热任务，失败时仅记录日志，首次上传会重新获取凭证
+        """
+        try:
+            self._get_cached_oss_token()
+        except Exception as e:
+            logger.debug(f"【P115Disk】预热 OSS 凭证失败: {e}")
+
+    @staticmethod
+    def _safe_abort(bucket: Bucket, object_name: str, upload_id: str):
+        """
+        取消分片上传，失败时仅记录日志，避免覆盖原始异常
+
+        :param bucket: OSS bucket
+        :param object_name: 对象名称
+        :param upload_id: 分片上传 ID
+        """
+        try:
+            bucket.abort_multipart_upload(object_name, upload_id)
+        except Exception as e:
+            logger.warn(f"【P115Disk】取消分片上传失败: {upload_id} - {e}")
 
     @staticmethod
-    def _is_token_expiring(
-        expiration_time: datetime, threshold_minutes: int = 5
+    def _preferred_part_size(file_size: int) -> int:
+        """
+        按文件大小计算期望分片大小，大文件使用更大的分片以减少请求次数
+
+        :param file_size: 文件大小
+
+        :return: 期望分片大小
+        """
+        return max(OSS_PART_SIZE_MIN, min(OSS_PART_SIZE_MAX, file_size // 200))
+
+    @staticmethod
+    def _parse_expiration(expiration_str: str) -> datetime:
+        """
+        解析 OSS 令牌过期时间
+
+        :param expiration_str: 过期时间字符串，通常为 YYYY-MM-DDTHH:MM:SSZ 格式
+
+        :return: 带 UTC 时区的过期时间
+        """
+        if len(expiration_str) == 20 and expiration_str[-1] == "Z":
+            return datetime(
+                int(expiration_str[0:4]),
+                int(expiration_str[5:7]),
+                int(expiration_str[8:10]),
+                int(expiration_str[11:13]),
+                int(expiration_str[14:16]),
+                int(expiration_str[17:19]),
+                tzinfo=timezone.utc,
+            )
+        return datetime.fromisoformat(expiration_str.replace("Z", "+00:00"))
+
+    @staticmethod
+    def _refresh_at(
+        issued_at: datetime, expiration_time: datetime, fraction: float
+    ) -> datetime:
+        """
+        计算凭证的提前刷新时间点
+
+        :param issued_at: 凭证获取时间
+        :param expiration_time: 凭证过期时间
+        :param fraction: 有效期消耗到该比例时刷新
+
+        :return: 刷新时间点，不晚于过期前的最小安全余量
+        """
+        return min(
+            issued_at + (expiration_time - issued_at) * fraction,
+            expiration_time - timedelta(seconds=OSS_TOKEN_MIN_MARGIN),
+        )
+
+    @staticmethod
+    def _should_refresh(
+        issued_at: datetime,
+        expiration_time: datetime,
+        fraction: float = OSS_TOKEN_REFRESH_RATIO,
     ) -> bool:
         """
-        检查 token 是否即将过期
+        按有效期消耗比例判断凭证是否需要刷新
 
-        :param expiration_time: token 过期时间
-        :param threshold_minutes: 提前多少分钟判定为即将过期（默认 5 分钟）
-        :return: True 表示即将过期或已过期
+        :param issued_at: 凭证获取时间
+        :param expiration_time: 凭证过期时间
+        :param fraction: 有效期消耗到该比例时刷新，默认0.7
+
+        :return: True 表示需要刷新
         """
-        now = datetime.now(timezone.utc)
-        remaining = (expiration_time - now).total_seconds()
-        return remaining < threshold_minutes * 60
+        return datetime.now(timezone.utc) >= P115Api._refresh_at(
+            issued_at, expiration_time, fraction
+        )
 
     def upload(
         self,
@@ -784,23 +1004,34 @@ class P115Api:
         # 清理缓存
         cache_id = self._id_cache.get_id_by_dir(target_path.as_posix())
         if cache_id:
-            self._id_cache.remove(id=cache_id)
-            self._id_item_cache.remove(id=cache_id)
+            self._item_store.remove(cache_id)
 
         # 初始化进度条
         logger.info(f"【P115Disk】开始上传: {local_path} -> {target_path}")
         progress_callback = transfer_process(local_path.as_posix())
 
+        # 整个上传过程复用同一个文件句柄读取校验区间与分片数据
+        local_file = open(local_path, "rb", buffering=0)
+        part_map: Optional[mmap] = None
+        with self._oss_token_lock:
+            self._active_uploads += 1
         try:
             # Step 1: 初始化上传
+            # 校验区间由服务端随机下发，无法提前预计算，重试时复用已计算结果
+            range_hash_cache: Dict[str, str] = {}
+
             def read_range_hash(range_str: str) -> str:
+                range_hash = range_hash_cache.get(range_str)
+                if range_hash is not None:
+                    return range_hash
                 start, end = map(int, range_str.split("-"))
-                with open(local_path, "rb") as f:
-                    f.seek(start)
-                    chunk = f.read(end - start + 1)
-                    sha1 = hashes.Hash(hashes.SHA1())
-                    sha1.update(chunk)
-                    return sha1.finalize().hex().upper()
+                range_hash = (
+                    sha1(read_range(local_file.fileno(), end - start + 1, start))
+                    .hexdigest()
+                    .upper()
+                )
+                range_hash_cache[range_str] = range_hash
+                return range_hash
 
             init_resp = None
             init_max_retries = 3
@@ -840,7 +1071,7 @@ class P115Api:
                 progress_callback(100)
                 return self.get_item(target_path)
 
-            logger.debug(f"【P115Disk】上传初始化结果: {init_resp}")
+            logger.debug("【P115Disk】上传初始化结果: %s", init_resp)
 
             # 获取上传信息
             bucket_name = init_resp.get("bucket")
@@ -851,6 +1082,15 @@ class P115Api:
                 logger.error(f"【P115Disk】上传信息不完整: {init_resp}")
                 return None
 
+            # 115 服务器回调头，简单上传与合并分片时共用
+            headers = {
+                "X-oss-callback": b64encode_as_string(callback_info["callback"]),
+                "x-oss-callback-var": b64encode_as_string(
+                    callback_info["callback_var"]
+                ),
+                "x-oss-forbid-overwrite": "false",
+            }
+
             # Step 2: 获取OSS上传凭证
             (
                 endpoint,
@@ -858,7 +1098,7 @@ class P115Api:
                 access_key_secret,
                 security_token,
                 token_expiration,
-            ) = self._get_oss_token()
+            ) = self._get_cached_oss_token()
             logger.info(
                 f"【P115Disk】OSS Token 过期时间: {token_expiration.strftime('%Y-%m-%d %H:%M:%S UTC')}"
             )
@@ -869,8 +1109,88 @@ class P115Api:
                 access_key_secret=access_key_secret,
                 security_token=security_token,
             )
-            bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-            part_size = determine_part_size(file_size, preferred_size=10 * 1024 * 1024)
+            bucket = Bucket(
+                auth, endpoint, bucket_name, session=self._oss_session
+            )  # noqa
+            part_size = determine_part_size(
+                file_size, preferred_size=self._preferred_part_size(file_size)
+            )
+
+            bucket_state = {"bucket": bucket, "expiration": token_expiration}
+            token_lock = Lock()
+
+            def refresh_bucket(
+                stale_bucket: Bucket,
+                token: Optional[Tuple[str, str, str, str, datetime]] = None,
+            ) -> Bucket:
+                """
+                使用新凭证重建 bucket，未传入凭证时重新获取，多个分片同时触发时只刷新一次
+                """
+                with token_lock:
+                    if bucket_state["bucket"] is not stale_bucket:
+                        return bucket_state["bucket"]
+                    (
+                        new_endpoint,
+                        new_access_key_id,
+                        new_access_key_secret,
+                        new_security_token,
+                        new_expiration,
+                    ) = token or self._get_oss_token()
+                    new_auth = StsAuth(
+                        access_key_id=new_access_key_id,
+                        access_key_secret=new_access_key_secret,
+                        security_token=new_security_token,
+                    )
+                    bucket_state["bucket"] = Bucket(
+                        new_auth, new_endpoint, bucket_name, session=self._oss_session
+                    )  # noqa
+                    bucket_state["expiration"] = new_expiration
+                    logger.info(
+                        f"【P115Disk】Token 刷新成功，新的过期时间: "
+                        f"{new_expiration.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+                    )
+                    return bucket_state["bucket"]
+
+            # 文件不超过一个分片时直接简单上传，省去初始化与合并分片两次请求
+            if file_size <= part_size:
+                logger.info("【P115Disk】文件小于分片大小，使用简单上传")
+                data = read_range(local_file.fileno(), file_size, 0)
+                max_retries = 2
+                for retry in range(max_retries):
+                    try:
+                        result = bucket.put_object(
+                            object_name,
+                            data,
+                            headers=headers,
+                            progress_callback=lambda consumed, total: (
+                                progress_callback(consumed * 100 / total)
+                                if total
+                                else None
+                            ),
+                        )
+                        break
+                    except ServerError as e:
+                        error_code = getattr(e, "code", "")
+                        if (
+                            error_code in ("InvalidAccessKeyId", "SecurityTokenExpired")
+                            and retry < max_retries - 1
+                        ):
+                            logger.warn(
+                                f"【P115Disk】检测到 Token 过期错误 ({error_code})，"
+                                f"正在刷新并重试..."
+                            )
+                            bucket = refresh_bucket(bucket)
+                            continue
+                        raise
+
+                progress_callback(100)
+                if result.status == 200:
+                    logger.info(f"【P115Disk】{target_name} 上传成功")
+                    return self.get_item(target_path)
+                logger.error(
+                    f"【P115Disk】{target_name} 上传失败，状态码: {result.status}"
+                )
+                return None
 
             logger.info(
                 f"【P115Disk】开始分片上传，分片大小: {part_size // 1024 // 1024}MB"
@@ -880,117 +1200,128 @@ class P115Api:
             upload_id = bucket.init_multipart_upload(
                 object_name, params={"encoding-type": "url", "sequential": ""}
             ).upload_id
-            parts = []
-
-            # 逐个上传分片并更新进度
-            with open(local_path, "rb") as fileobj:
-                part_number = 1
-                offset = 0
-                while offset < file_size:
-                    # 检查是否取消上传
-                    if global_vars.is_transfer_stopped(local_path.as_posix()):
+
+            def upload_part(
+                part_number: int, offset: int, size: int
+            ) -> Optional[PartInfo]:
+                """
+                上传单个分片，数据取自文件内存映射，带重试机制处理 token 过期错误，
+                上传已取消时直接返回 None
+                """
+                if global_vars.is_transfer_stopped(local_path.as_posix()):
+                    return None
+                current_bucket = bucket_state["bucket"]
+                # 后台定时器已刷新凭证时直接切换，无需在上传线程中等待 STS 请求
+                cached_token = self._oss_token_cache
+                if (
+                    cached_token is not None
+                    and cached_token[4] > bucket_state["expiration"]
+                ):
+                    current_bucket = refresh_bucket(current_bucket, cached_token)
+
+                # 从内存映射切片分片数据，无法映射时按偏移读取，重试时直接复用
+                if part_map is None:
+                    data = read_range(local_file.fileno(), size, offset)
+                    prefetch_offset = file_size
+                else:
+                    data = part_map[offset : offset + size]
+                    prefetch_offset = offset + part_size * OSS_UPLOAD_MAX_WORKERS
+                # 提示内核预读下一轮将被取用的分片，使磁盘读取与网络发送重叠
+                if MADV_WILLNEED is not None and prefetch_offset < file_size:
+                    prefetch_start = prefetch_offset - prefetch_offset % PAGESIZE
+                    part_map.madvise(
+                        MADV_WILLNEED,
+                        prefetch_start,
+                        min(part_size, file_size - prefetch_offset)
+                        + prefetch_offset
+                        - prefetch_start,
+                    )
+                max_retries = 2
+                for retry in range(max_retries):
+                    try:
+                        result = current_bucket.upload_part(
+                            object_name,
+                            upload_id,
+                            part_number,
+                            data=data,
+                        )
+                        return PartInfo(part_number, result.etag)
+                    except ServerError as e:
+                        # 检查是否是 token 过期错误
+                        error_code = getattr(e, "code", "")
+                        if (
+                            error_code in ("InvalidAccessKeyId", "SecurityTokenExpired")
+                            and retry < max_retries - 1
+                        ):
+                            logger.warn(
+                                f"【P115Disk】检测到 Token 过期错误 ({error_code})，"
+                                f"正在刷新并重试..."
+                            )
+                            current_bucket = refresh_bucket(current_bucket)
+                            continue
+                        raise
+
+            if file_size:
+                try:
+                    part_map = mmap(local_file.fileno(), 0, access=ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    # 部分网络或 FUSE 挂载不支持内存映射，回退为共享句柄按偏移读取
+                    logger.debug("【P115Disk】内存映射失败，使用按偏移读取: %s", e)
+            part_specs = [
+                (index + 1, offset, min(part_size, file_size - offset))
+                for index, offset in enumerate(range(0, file_size, part_size))
+            ]
+            parts: List[PartInfo] = []
+            uploaded_size = 0
+            last_progress_ts = 0.0
+
+            # 并发上传分片并更新进度
+            with ThreadPoolExecutor(
+                max_workers=OSS_UPLOAD_MAX_WORKERS,
+                thread_name_prefix="P115Disk-Upload",
+            ) as executor:
+                futures = {
+                    executor.submit(upload_part, *spec): spec[2] for spec in part_specs
+                }
+                for future in as_completed(futures):
+                    try:
+                        part = future.result()
+                    except Exception as e:
+                        # 其他错误或重试次数用尽，放弃上传
+                        logger.error(f"【P115Disk】上传分片失败: {str(e)}")
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        self._safe_abort(
+                            bucket_state["bucket"], object_name, upload_id
+                        )
+                        raise
+                    # 检查是否取消上传，分片线程检测到取消时返回 None
+                    if part is None or global_vars.is_transfer_stopped(
+                        local_path.as_posix()
+                    ):
                         logger.info(f"【P115Disk】{local_path} 上传已取消！")
-                        bucket.abort_multipart_upload(object_name, upload_id)
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        self._safe_abort(
+                            bucket_state["bucket"], object_name, upload_id
+                        )
                         return None
+                    parts.append(part)
 
-                    # 检查 token 是否即将过期（提前 5 分钟刷新）
-                    if self._is_token_expiring(token_expiration, threshold_minutes=5):
-                        logger.info("【P115Disk】Token 即将过期，正在刷新...")
-                        try:
-                            (
-                                endpoint,
-                                access_key_id,
-                                access_key_secret,
-                                security_token,
-                                token_expiration,
-                            ) = self._get_oss_token()
-                            # 重新创建认证和 bucket 对象
-                            auth = StsAuth(
-                                access_key_id=access_key_id,
-                                access_key_secret=access_key_secret,
-                                security_token=security_token,
-                            )
-                            bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-                            logger.info(
-                                f"【P115Disk】Token 刷新成功，新的过期时间: "
-                                f"{token_expiration.strftime('%Y-%m-%d %H:%M:%S UTC')}"
-                            )
-                        except Exception as e:
-                            logger.error(f"【P115Disk】刷新 Token 失败: {str(e)}")
-                            bucket.abort_multipart_upload(object_name, upload_id)
-                            return None
+                    # 更新进度，回调频率限制在每秒 10 次以内，完成时由后续统一上报
+                    uploaded_size += futures[future]
+                    now = monotonic()
+                    if now - last_progress_ts >= 0.1:
+                        last_progress_ts = now
+                        progress = (uploaded_size * 100) / file_size
+                        progress_callback(progress)
+                        logger.debug("【P115Disk】上传进度: %.1f%%", progress)
 
-                    num_to_upload = min(part_size, file_size - offset)
-
-                    # 上传分片，带重试机制处理 token 过期错误
-                    max_retries = 2
-                    for retry in range(max_retries):
-                        try:
-                            result = bucket.upload_part(
-                                object_name,
-                                upload_id,
-                                part_number,
-                                data=SizedFileAdapter(fileobj, num_to_upload),
-                            )
-                            parts.append(PartInfo(part_number, result.etag))
-                            break  # 上传成功，跳出重试循环
-                        except ServerError as e:
-                            # 检查是否是 token 过期错误
-                            error_code = getattr(e, "code", "")
-                            if (
-                                error_code
-                                in ("InvalidAccessKeyId", "SecurityTokenExpired")
-                                and retry < max_retries - 1
-                            ):
-                                logger.warn(
-                                    f"【P115Disk】检测到 Token 过期错误 ({error_code})，"
-                                    f"正在刷新并重试..."
-                                )
-                                # 刷新 token
-                                (
-                                    endpoint,
-                                    access_key_id,
-                                    access_key_secret,
-                                    security_token,
-                                    token_expiration,
-                                ) = self._get_oss_token()
-                                auth = StsAuth(
-                                    access_key_id=access_key_id,
-                                    access_key_secret=access_key_secret,
-                                    security_token=security_token,
-                                )
-                                bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-                                # 需要重新定位文件指针
-                                fileobj.seek(offset)
-                                continue
-                            else:
-                                # 其他错误或重试次数用尽，放弃上传
-                                logger.error(f"【P115Disk】上传分片失败: {str(e)}")
-                                bucket.abort_multipart_upload(object_name, upload_id)
-                                raise
-
-                    # 更新偏移和分片号
-                    offset += num_to_upload
-                    part_number += 1
-
-                    # 实时更新进度
-                    progress = (offset * 100) / file_size
-                    progress_callback(progress)
-                    logger.debug(f"【P115Disk】上传进度: {progress:.1f}%")
+            parts.sort(key=lambda part: part.part_number)
+            bucket = bucket_state["bucket"]
 
             # 完成上传
             progress_callback(100)
 
             # Step 4: 完成OSS上传并回调115服务器
-            def encode_callback(cb: str) -> str:
-                return b64encode_as_string(cb)
-
-            headers = {
-                "X-oss-callback": encode_callback(callback_info["callback"]),
-                "x-oss-callback-var": encode_callback(callback_info["callback_var"]),
-                "x-oss-forbid-overwrite": "false",
-            }
-
             result = bucket.complete_multipart_upload(
                 object_name, upload_id, parts, headers=headers
             )
@@ -1007,6 +1338,12 @@ class P115Api:
         except Exception as e:
             logger.error(f"【P115Disk】上传失败: {local_path} - {str(e)}")
             return None
+        finally:
+            with self._oss_token_lock:
+                self._active_uploads -= 1
+            if part_map is not None:
+                part_map.close()
+            local_file.close()
 
     def detail(self, fileitem: FileItem) -> Optional[FileItem]:
         """
@@ -1043,7 +1380,7 @@ class P115Api:
                     fileitem.fileid, pid=parent_id, **get_ios_ua_app()
                 )
             check_response(resp)
-            logger.debug(f"【P115Disk】复制文件: {resp}")
+            logger.debug("【P115Disk】复制文件: %s", resp)
             new_path = Path(path) / fileitem.name
             new_item = self.get_item(new_path)
             self.rename(new_item, new_name)
@@ -1077,31 +1414,18 @@ class P115Api:
                     fileitem.fileid, pid=parent_id, **get_ios_ua_app()
                 )
             check_response(resp)
-            logger.debug(f"【P115Disk】移动文件: {resp}")
+            logger.debug("【P115Disk】移动文件: %s", resp)
             new_path = Path(path) / fileitem.name
-
-            old_cache_path = self._id_cache.get_dir_by_id(int(fileitem.fileid))
-            if old_cache_path:
-                self._id_cache.remove(id=int(fileitem.fileid))
-                self._id_cache.add_cache(
-                    id=int(fileitem.fileid),
-                    directory=new_path.as_posix(),
-                )
-            old_cache_item = self._id_item_cache.get_item(int(fileitem.fileid))
-            if old_cache_item:
-                self._id_item_cache.add_cache(
-                    id=int(fileitem.fileid),
-                    item={
-                        "path": new_path.as_posix(),
-                        "id": old_cache_item["id"],
-                        "size": old_cache_item["size"],
-                        "modify_time": old_cache_item["modify_time"],
-                        "pickcode": old_cache_item["pickcode"],
-                        "is_dir": old_cache_item["is_dir"],
-                    },
-                )
-
-            new_item = self.get_item(new_path)
+            self._item_store.relocate(int(fileitem.fileid), new_path.as_posix())
+
+            # 移动不改变文件 ID，直接由原文件项构造新文件项，省去一次查询
+            new_item = fileitem.model_copy(
+                update={
+                    "parent_fileid": str(parent_id),
+                    "path": new_path.as_posix()
+                    + ("/" if fileitem.type == "dir" else ""),
+                }
+            )
             self.rename(new_item, new_name)
             return True
         except Exception as e:
@@ -1139,11 +1463,10 @@ class P115Api:
         try:
             resp = self.client.fs_index_info(0, **get_ios_ua_app(app=False))
             check_response(resp)
-            return StorageUsage(
-                total=resp["data"]["space_info"]["all_total"]["size"],
-                available=int(resp["data"]["space_info"]["all_total"]["size"])
-                - int(resp["data"]["space_info"]["all_use"]["size"]),
-            )
+            space_info = resp["data"]["space_info"]
+            total = int(space_info["all_total"]["size"])
+            used = int(space_info["all_use"]["size"])
+            return StorageUsage(total=total, available=total - used)
         except Exception:
             return None
 
@@ -1163,4 +1486,4 @@ class P115Api:
 
         :return: 是否支持
         """
-        return transtype in self.transtype
+        return transtype in self._transtype_set
@@ -1,6 +1,14 @@
+from os import lseek, read, SEEK_SET
 from threading import Lock
 from time import monotonic, sleep
-from typing import Dict, List, Any
+from typing import Dict, Any
+
+try:
+    from os import pread
+except ImportError:
+    pread = None
+
+_seek_lock = Lock()
 
 IOS_UA = (
     "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5_1 like Mac OS X) "
@@ -20,42 +28,57 @@ def get_ios_ua_app(app: bool = True) -> Dict[str, str]:
     return kwargs
 
 
-class RateLimiter:
+def read_range(fd: int, length: int, offset: int) -> bytes:
     """
-    速率限制器，基于滑动时间窗口的流控工具类
+    从文件描述符的指定偏移读取数据，支持 pread 的平台无需移动文件指针，可多线程并发调用
+
+    :param fd: 已打开的文件描述符
+    :param length: 读取长度
+    :param offset: 起始偏移
+
+    :return: 读取到的数据
     """
+    if pread is not None:
+        return pread(fd, length, offset)
+    # 不支持 pread 时移动文件指针会影响其他线程，需要串行读取
+    with _seek_lock:
+        lseek(fd, offset, SEEK_SET)
+        return read(fd, length)
+
+
+class TokenBucket:
+    """
+    速率限制器，基于令牌桶的流控工具类
+    """
+
+    __slots__ = ("capacity", "rate", "name", "_tokens", "_last", "_lock")
 
-    def __init__(self, max_calls: int = 2, time_window: float = 1.0, name: str = ""):
+    def __init__(self, capacity: int = 2, rate: float = 2.0, name: str = ""):
         """
-        初始化速率限制器
+        初始化令牌桶
 
-        :param max_calls: 时间窗口内最大调用次数，默认2次
-        :param time_window: 时间窗口大小（秒），默认1.0秒
+        :param capacity: 桶容量，即允许的最大突发调用次数，默认2次
+        :param rate: 令牌补充速率（次/秒），默认2.0
         :param name: 限流器名称，用于日志输出，默认为空
         """
-        self.max_calls = max_calls
-        self.time_window = time_window
+        self.capacity = float(capacity)
+        self.rate = rate
         self.name = name
+        self._tokens = float(capacity)
+        self._last = monotonic()
         self._lock = Lock()
-        self._call_times: List[float] = []
 
     def acquire(self):
         """
-        获取调用许可，如果超过限制会阻塞等待直到满足条件
+        获取调用许可，令牌不足时预占令牌并在锁外等待补足
         """
-        now = monotonic()
         with self._lock:
-            self._call_times = [
-                t for t in self._call_times if now - t < self.time_window
-            ]
-
-            if len(self._call_times) >= self.max_calls:
-                oldest_call = min(self._call_times)
-                wait_time = self.time_window - (now - oldest_call)
-                if wait_time > 0:
-                    sleep(wait_time)
-                    now = monotonic()
-                    self._call_times = [
-                        t for t in self._call_times if now - t < self.time_window
-                    ]
-            self._call_times.append(now)
+            now = monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= 1.0
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_time > 0:
+            sleep(wait_time)
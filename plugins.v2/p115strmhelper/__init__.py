@@ -1360,6 +1360,8 @@ class P115StrmHelper(_PluginBase):
         ct_db_manager.close_database()
         U115Patcher().disable()
         P115DiskPatcher().disable()
+        if self.mcp_manager is not None:
+            self.mcp_manager.close()
 
     async def _save_config_api(self, request: Request) -> Dict:
         """
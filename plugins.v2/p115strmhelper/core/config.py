@@ -496,6 +496,9 @@ class ConfigManager(BaseModel):
     upload_module_force_upload_wait_size: Optional[int] = Field(
         default=None, ge=0, description="115 上传增强强制等待秒传的文件大小阈值"
     )
+    upload_module_parallel_parts: int = Field(
+        default=4, ge=1, le=16, description="115 上传增强分片并发上传数量"
+    )
     upload_module_skip_slow_upload_size: Optional[int] = Field(
         default=None,
         ge=0,
@@ -706,8 +709,9 @@ class ConfigManager(BaseModel):
             2: "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
             3: settings.USER_AGENT,
             4: "Mozilla/5.0 (Linux; Android 11; Redmi Note 8 Pro Build/RP1A.200720.011; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/89.0.4389.72 MQQBrowser/6.2 TBS/045913 Mobile Safari/537.36 V1_AND_SQ_8.8.68_2538_YYB_D A_8086800 QQ/8.8.68.7265 NetType/WIFI WebP/0.3.0 Pixel/1080 StatusBarHeight/76 SimpleUISwitch/1 QQTheme/2971 InMagicWin/0 StudyMode/0 CurrentMode/1 CurrentFontScale/1.0 GlobalDensityScale/0.9818182 AppId/537112567 Edg/98.0.4758.102",
-            5: UserAgentUtils.generate_u115_ios(),
         }
+        if utype == 5:
+            return UserAgentUtils.generate_u115_ios()
         if utype in user_agents:
             return user_agents[utype]
         return (
@@ -9,15 +9,19 @@ __all__ = [
 
 
 from asyncio import sleep as async_sleep
+from collections import deque
 from collections.abc import AsyncIterator, Container, Coroutine, Iterator, Callable
 from dataclasses import dataclass
-from functools import partial
+from functools import lru_cache, partial
 from itertools import cycle
 from os import PathLike
 from pathlib import Path
+from queue import Queue
+from re import compile as re_compile
+from threading import Event, Lock
 from time import time, sleep
-from typing import Literal, List, Tuple, Dict, Any, Set, Optional
-from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from typing import Literal, List, Tuple, Dict, Any, Deque, Optional
+from concurrent.futures import ThreadPoolExecutor, Future
 
 from iterutils import Yield, run_gen_step_iter
 from p115client import P115Client, check_response
@@ -67,6 +71,41 @@ class ShareP115Client(P115Client):
         return self.request(url=api, params=payload, async_=async_, **request_kwargs)
 
 
+# 异常文本中以 errno 字段形式出现的限流错误码，如 errno=990009、'errno': 990009
+_RATE_LIMIT_ERRNO = re_compile(r"""\berrno['"]?\s*[:=]\s*990009\b""")
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    """
+    判断异常是否为接口限流
+
+    :param e: 接口调用抛出的异常
+
+    :return: 是否为限流
+    """
+    if getattr(e, "status_code", None) == 429 or getattr(e, "errno", None) == 990009:
+        return True
+    message = str(e)
+    return "Too Many Requests" in message or bool(_RATE_LIMIT_ERRNO.search(message))
+
+
+# 正在请求中的文件夹路径，键为 (路径, mkdir, update_cache)，值为 (完成事件, 结果容器)
+_pid_inflight: Dict[Tuple[str, bool, bool], Tuple[Event, List[int]]] = {}
+_pid_inflight_lock = Lock()
+
+
+@lru_cache(maxsize=4096)
+def _escape_share_name(name: str) -> str:
+    """
+    转义分享文件名中的路径分隔符，同一分享中重复出现的文件名直接复用结果
+
+    :param name: 原始文件名
+
+    :return: 转义后的文件名
+    """
+    return posix_escape_name(name, repl="|")
+
+
 def iter_share_files_with_path(
     client: str | PathLike | ShareP115Client,
     share_code: str,
@@ -103,6 +142,7 @@ def iter_share_files_with_path(
         1: 快 (0.5s, 0.5s, 1.5s)
         2: 慢 (1s, 1s, 2s)
         3: 最慢 (1.5s, 1.5s, 2s)
+        以上为各端点的初始冷却时间，触发限流时自动加倍，连续成功后回落
 
     :return: 迭代器，返回此分享链接下的（所有文件）文件信息
     """
@@ -164,10 +204,8 @@ def iter_share_files_with_path(
         api_name="share_snap",
         base_url=None,
     )
-    repeating_pair = [snap_app_https_info]
-    first_page_api_pool = repeating_pair * 6
-    first_page_api_pool.insert(6, snap_api_info)
-    first_page_api_cycler = cycle(repeating_pair)
+    # 目录首页轮询使用的接口，后续分页固定走 snap 接口
+    first_page_api_cycler = cycle([snap_app_https_info])
 
     def _extract(resp_obj: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
         data_obj = resp_obj.get("data", {})
@@ -176,27 +214,42 @@ def iter_share_files_with_path(
     def _call_endpoint(
         api_info: ApiEndpointInfo, payload: Dict[str, Any]
     ) -> Dict[str, Any]:
-        try:
-            resp = api_info.endpoint(payload)
-            check_response(resp)
-            return resp
-        except Exception as e:
-            api_info_str = f"API: {api_info.api_name}"
-            if api_info.base_url:
-                api_info_str += f", Base URL: {api_info.base_url}"
-            api_info_str += f", Payload: {payload}"
-            error_msg = f"{str(e)} | {api_info_str}"
+        max_attempts = 3
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                if e.args:
-                    e.args = (error_msg,) + e.args[1:]
-                else:
-                    e.args = (error_msg,)
-            except (TypeError, AttributeError):
-                wrapper_msg = f"Exception occurred: {error_msg}"
-                wrapper_e = RuntimeError(wrapper_msg)
-                wrapper_e.__cause__ = e
-                raise wrapper_e from e
-            raise
+                resp = api_info.endpoint(payload)
+                check_response(resp)
+                api_info.endpoint.record_success()
+                return resp
+            except Exception as e:
+                # 触发限流时加大该端点冷却时间后重试
+                if attempt < max_attempts and _is_rate_limited(e):
+                    api_info.endpoint.backoff()
+                    continue
+                api_info_str = f"API: {api_info.api_name}"
+                if api_info.base_url:
+                    api_info_str += f", Base URL: {api_info.base_url}"
+                # 分享码与提取码对每次请求都相同，不写入错误信息
+                payload_info = {
+                    key: value
+                    for key, value in payload.items()
+                    if key not in ("share_code", "receive_code")
+                }
+                api_info_str += f", Payload: {payload_info}"
+                error_msg = f"{str(e)} | {api_info_str}"
+                try:
+                    if e.args:
+                        e.args = (error_msg,) + e.args[1:]
+                    else:
+                        e.args = (error_msg,)
+                except (TypeError, AttributeError):
+                    wrapper_msg = f"Exception occurred: {error_msg}"
+                    wrapper_e = RuntimeError(wrapper_msg)
+                    wrapper_e.__cause__ = e
+                    raise wrapper_e from e
+                raise
 
     def _job(
         api_info: ApiEndpointInfo,
@@ -225,48 +278,75 @@ def iter_share_files_with_path(
             count, items = _extract(resp)
         files_found = []
         subdirs_to_scan = []
+        # 路径前缀每页只拼接一次；分享码在归一化后写入，normalize_attr 不读取这两个字段
+        prefix = f"{path_prefix}/"
         for attr in items:
+            attr = normalize_attr(attr)
             attr["share_code"] = share_code
             attr["receive_code"] = receive_code
-            attr = normalize_attr(attr)
-            name = posix_escape_name(attr["name"], repl="|")
+            name = _escape_share_name(attr["name"])
             attr["name"] = name
-            path = f"{path_prefix}/{name}" if path_prefix else f"/{name}"
+            path = prefix + name
             if attr["is_dir"]:
                 subdirs_to_scan.append((int(attr["id"]), path, 0))
             else:
                 attr["path"] = path
                 files_found.append(attr)
-        new_offset = offset + len(items)
-        if new_offset < count and len(items) > 0:
-            subdirs_to_scan.append((_cid, path_prefix, new_offset))
+        # 首页返回满页时按 limit 步长一次性派发剩余所有分页，大目录的分页可并行获取；
+        # 接口实际单页条数小于 limit 时窗口无法对齐，退回逐页串行获取
+        page_size = len(items)
+        if page_size == limit:
+            if offset == 0:
+                for new_offset in range(limit, count, limit):
+                    subdirs_to_scan.append((_cid, path_prefix, new_offset))
+        elif page_size > 0 and offset + page_size < count:
+            subdirs_to_scan.append((_cid, path_prefix, offset + page_size))
         return files_found, subdirs_to_scan
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        pending_futures: Set[Future] = set()
-        initial_future = executor.submit(_job, next(first_page_api_cycler), cid, "", 0)
-        pending_futures.add(initial_future)
-        while pending_futures:
-            for future in as_completed(pending_futures):
-                pending_futures.remove(future)
-                try:
-                    files, subdirs = future.result()
-                    for file_info in files:
-                        yield file_info
+    # 线程池少开一个线程，由调用线程分担任务；任务完成时由回调放入完成队列，
+    # 主线程每次取出当前所有已完成结果批量处理，无需反复等待整个任务集合
+    pool_size = max(max_workers - 1, 1)
+    ready: Deque[Tuple[ApiEndpointInfo, int, str, int]] = deque(
+        [(next(first_page_api_cycler), cid, "", 0)]
+    )
+    completed: Queue[Future] = Queue()
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        in_flight = 0
+
+        def _submit_ready() -> None:
+            nonlocal in_flight
+            while ready and in_flight < pool_size:
+                future = executor.submit(_job, *ready.popleft())
+                future.add_done_callback(completed.put)
+                in_flight += 1
+
+        try:
+            while ready or in_flight:
+                _submit_ready()
+                if ready and completed.empty():
+                    # 线程池已满且暂无完成结果时，调用线程直接执行一个任务
+                    results = [_job(*ready.popleft())]
+                else:
+                    results = [completed.get().result()]
+                    in_flight -= 1
+                    while not completed.empty():
+                        results.append(completed.get_nowait().result())
+                        in_flight -= 1
+                for _, subdirs in results:
                     for task_args in subdirs:
                         task_offset = task_args[2]
                         if task_offset > 0:
                             api_to_use = snap_api_info
                         else:
                             api_to_use = next(first_page_api_cycler)
-                        new_future = executor.submit(_job, api_to_use, *task_args)
-                        pending_futures.add(new_future)
-                except Exception:
-                    for f in pending_futures:
-                        f.cancel()
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    raise
-                break
+                        ready.append((api_to_use, *task_args))
+                # 先补满线程池再向调用方产出文件，调用方处理文件期间后台继续拉取
+                _submit_ready()
+                for files, _ in results:
+                    yield from files
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
 
 
 def get_pid_by_path(
@@ -277,7 +357,7 @@ def get_pid_by_path(
     by_cache: bool = True,
 ) -> int:
     """
-    通过文件夹路径获取 ID
+    通过文件夹路径获取 ID，同一路径的并发请求只调用一次接口，其余调用等待并复用结果
 
     :param client: 115 客户端
     :param path: 文件夹路径
@@ -287,8 +367,6 @@ def get_pid_by_path(
 
     :return int: 文件夹 ID，0 为根目录，-1 为获取失败
     """
-    from .config import configer
-
     path = Path(path).as_posix()
     if path == "/":
         return 0
@@ -296,6 +374,49 @@ def get_pid_by_path(
         pid = idpathcacher.get_id_by_dir(directory=path)
         if pid:
             return pid
+
+    key = (path, mkdir, update_cache)
+    with _pid_inflight_lock:
+        inflight = _pid_inflight.get(key)
+        if inflight is None:
+            inflight = _pid_inflight[key] = (Event(), [])
+            leader = True
+        else:
+            leader = False
+    event, result = inflight
+    if not leader:
+        event.wait()
+        if result:
+            return result[0]
+        # 首个请求失败时由当前调用自行请求，以便向调用方抛出各自的异常
+        return _get_pid_by_path(client, path, mkdir, update_cache)
+    try:
+        result.append(_get_pid_by_path(client, path, mkdir, update_cache))
+        return result[0]
+    finally:
+        with _pid_inflight_lock:
+            del _pid_inflight[key]
+        event.set()
+
+
+def _get_pid_by_path(
+    client: P115Client,
+    path: str,
+    mkdir: bool,
+    update_cache: bool,
+) -> int:
+    """
+    请求接口获取文件夹 ID
+
+    :param client: 115 客户端
+    :param path: 文件夹路径（POSIX 格式）
+    :param mkdir: 不存在则创建文件夹
+    :param update_cache: 更新文件路径 ID 到缓存中
+
+    :return int: 文件夹 ID，-1 为获取失败
+    """
+    from .config import configer
+
     resp = client.fs_dir_getid(path, **configer.get_ios_ua_app(app=False))
     check_response(resp)
     pid = resp.get("id", -1)
@@ -309,6 +430,9 @@ def get_pid_by_path(
             idpathcacher.add_cache(id=int(pid), directory=path)
         return pid
     if pid != 0:
+        # 已存在的目录同样写入缓存，同一目录的后续调用无需再次请求接口
+        if update_cache:
+            idpathcacher.add_cache(id=int(pid), directory=path)
         return pid
     return -1
 
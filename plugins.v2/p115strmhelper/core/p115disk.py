@@ -1,15 +1,21 @@
 __all__ = ["P115DiskCore"]
 
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from hashlib import sha1
+from mmap import mmap, ACCESS_READ
+from os import lseek, read, SEEK_SET
 from pathlib import Path
-from time import perf_counter, sleep
-from typing import Any, Optional
+from queue import Queue
+from random import uniform
+from threading import Event, Lock, Thread
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from cryptography.hazmat.primitives import hashes
-from oss2 import StsAuth, Bucket, determine_part_size
+from oss2 import StsAuth, Bucket, Session as OssSession
 from oss2.exceptions import ServerError
 from oss2.models import PartInfo
-from oss2.utils import b64encode_as_string, SizedFileAdapter
+from oss2.utils import b64encode_as_string
 from p115center import P115Center, UploadInfo
 from p115client import P115Client, check_response
 
@@ -23,6 +29,101 @@ from ..core.config import configer
 from ..core.i18n import i18n
 from ..core.message import post_message
 
+try:
+    from os import pread
+except ImportError:
+    pread = None
+
+try:
+    from mmap import MADV_SEQUENTIAL
+except ImportError:
+    MADV_SEQUENTIAL = None
+
+try:
+    from os import posix_fadvise, POSIX_FADV_SEQUENTIAL
+except ImportError:
+    posix_fadvise = POSIX_FADV_SEQUENTIAL = None
+
+_seek_lock = Lock()
+
+OSS_PART_SIZE = 10 * 1024 * 1024
+OSS_MAX_PART_COUNT = 10000
+
+# P115Center 内部持有长连接会话，按机器码共享，客户端重建时无需重新建立连接
+_p115_centers: Dict[str, P115Center] = {}
+_p115_centers_lock = Lock()
+
+# 用户上传速度状态变化缓慢，所有上传共用最近一次查询结果：(查询时间, 结果)
+_speed_status_cache: Optional[Tuple[float, Any]] = None
+_speed_status_lock = Lock()
+
+if sha1.__name__ != "openssl_sha1":
+    # 未链接 OpenSSL 时 hashlib 回退为内置实现，大文件 SHA1 计算明显变慢
+    logger.warn("【P115Disk】hashlib 未使用 OpenSSL 实现，上传前的 SHA1 计算可能较慢")
+
+
+def _read_at(fd: int, length: int, offset: int) -> bytes:
+    """
+    从文件描述符的指定偏移读取数据，可多线程并发调用
+
+    :param fd: 已打开的文件描述符
+    :param length: 读取长度
+    :param offset: 起始偏移
+
+    :return: 读取到的数据
+    """
+    if pread is not None:
+        return pread(fd, length, offset)
+    with _seek_lock:
+        lseek(fd, offset, SEEK_SET)
+        return read(fd, length)
+
+
+def _sha1_at(fd: int, offset: int, length: int) -> Any:
+    """
+    按 1 MiB 分块读取文件指定区间并增量计算 SHA1，避免一次性读入整个区间
+
+    :param fd: 已打开的文件描述符
+    :param offset: 起始偏移
+    :param length: 区间长度
+
+    :return: SHA1 哈希对象
+    """
+    hasher = sha1()
+    end = offset + length
+    for chunk_offset in range(offset, end, 1 << 20):
+        hasher.update(_read_at(fd, min(1 << 20, end - chunk_offset), chunk_offset))
+    return hasher
+
+
+def _part_size(file_size: int) -> int:
+    """
+    计算分片大小：默认 10MB，分片数超过 OSS 上限 10000 时按需增大并向上取整到 1MB
+
+    :param file_size: 文件大小
+
+    :return: 分片大小
+    """
+    if file_size <= OSS_PART_SIZE:
+        return max(file_size, 1)
+    part_size = max(OSS_PART_SIZE, -(-file_size // OSS_MAX_PART_COUNT))
+    return -(-part_size // (1 << 20)) << 20
+
+
+def _get_p115_center(machine_id: str) -> P115Center:
+    """
+    获取共享的 P115Center 实例
+
+    :param machine_id: 机器码
+
+    :return: P115Center 实例
+    """
+    with _p115_centers_lock:
+        center = _p115_centers.get(machine_id)
+        if center is None:
+            center = _p115_centers[machine_id] = P115Center(machine_id)
+        return center
+
 
 class P115DiskCore:
     """
@@ -41,13 +142,96 @@ class P115DiskCore:
         if P115_API_AVAILABLE:
             self._p115_api = P115Api(client=client, disk_name="115网盘Plus")
 
-        self.p115_center = P115Center(configer.get_config("MACHINE_ID"))
+        self.p115_center = _get_p115_center(configer.get_config("MACHINE_ID"))
+        self._stop_event = Event()
+        self._notify_queue: Queue = Queue()
+        self._notify_thread: Optional[Thread] = None
+        self._notify_lock = Lock()
+        # OSS 连接池在上传与凭证刷新之间共用，刷新凭证后无需重新建立 TLS 连接
+        self._oss_session = OssSession(pool_size=16)
+
+    def stop(self):
+        """
+        停止服务，唤醒所有正在等待秒传的上传并取消，并停止 P115Api 的后台任务
+        """
+        self._stop_event.set()
+        # 旧版本 P115Disk 插件的 P115Api 没有后台任务，也没有 stop 方法
+        api_stop = getattr(self._p115_api, "stop", None)
+        if callable(api_stop):
+            api_stop()
+        with self._notify_lock:
+            if self._notify_thread is not None and self._notify_thread.is_alive():
+                self._notify_queue.put(None)
+
+    def _dispatch(self, func: Callable[..., Any], *args, **kwargs):
+        """
+        将上报与通知放入后台线程按顺序执行，避免慢速的服务器阻塞上传流程
+
+        :param func: 待执行的函数
+        """
+        with self._notify_lock:
+            if self._notify_thread is None or not self._notify_thread.is_alive():
+                self._notify_thread = Thread(
+                    target=self._notify_worker, name="P115Disk-Notify", daemon=True
+                )
+                self._notify_thread.start()
+        self._notify_queue.put((func, args, kwargs))
+
+    def _notify_worker(self):
+        """
+        后台通知线程，收到 None 时退出
+        """
+        while True:
+            task = self._notify_queue.get()
+            if task is None:
+                return
+            func, args, kwargs = task
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logger.warn(f"【P115Disk】发送上传通知失败: {e}")
+
+    def _get_speed_status(self) -> Any:
+        """
+        获取用户上传速度状态，30 秒内复用上次结果，并发上传同时查询时只请求一次
+
+        :return: 上传速度状态
+        """
+        global _speed_status_cache
+        with _speed_status_lock:
+            cached = _speed_status_cache
+            now = monotonic()
+            if cached is not None and now - cached[0] < 30:
+                return cached[1]
+            resp = self.p115_center.user_speed_status()
+            _speed_status_cache = (now, resp)
+            return resp
+
+    def _wait_or_stopped(self, local_path: Path, timeout: float) -> bool:
+        """
+        等待指定时长，期间每秒检查上传是否被取消或服务是否停止
+
+        :param local_path: 本地文件路径
+        :param timeout: 等待时长（秒）
+
+        :return: 上传已取消返回 True，等待结束返回 False
+        """
+        key = local_path.as_posix()
+        deadline = monotonic() + timeout
+        while True:
+            if self._stop_event.is_set() or global_vars.is_transfer_stopped(key):
+                return True
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return False
+            self._stop_event.wait(min(remaining, 1))
 
     def upload(
         self,
         target_dir: FileItem,
         local_path: Path,
         new_name: Optional[str] = None,
+        file_sha1: Optional[str] = None,
     ) -> Optional[FileItem]:
         """
         上传文件到云盘
@@ -55,21 +239,30 @@ class P115DiskCore:
         :param target_dir: 上传目标目录项
         :param local_path: 本地文件路径
         :param new_name: 上传后的文件名，如果为None则使用本地文件名
+        :param file_sha1: 文件 SHA1，调用方已计算时传入可跳过整文件哈希
 
         :return: 上传成功返回文件项，失败返回None
         """
 
         def read_range_hash(range_str: str) -> str:
             start, end = map(int, range_str.split("-"))
-            with open(local_path, "rb") as f:
-                f.seek(start)
-                chunk = f.read(end - start + 1)
-                sha1 = hashes.Hash(hashes.SHA1())
-                sha1.update(chunk)
-                return sha1.finalize().hex().upper()
+            if file_map is not None:
+                # 直接对内存映射的视图计算哈希，不复制区间数据
+                with memoryview(file_map) as view, view[start : end + 1] as chunk:
+                    return sha1(chunk).hexdigest().upper()
+            return (
+                _sha1_at(local_file.fileno(), start, end - start + 1)
+                .hexdigest()
+                .upper()
+            )
 
-        def encode_callback(cb: str) -> str:
-            return b64encode_as_string(cb)
+        def read_bytes(offset: int, length: int) -> bytes:
+            """
+            读取上传文件指定区间，优先使用内存映射，无法映射时通过共享句柄按偏移读取
+            """
+            if file_map is not None:
+                return file_map[offset : offset + length]
+            return _read_at(local_file.fileno(), length, offset)
 
         def send_upload_info(
             file_sha1: Optional[str],
@@ -156,6 +349,29 @@ class P115DiskCore:
                     text=error_text,
                 )
 
+        def send_upload_success(second_auth: bool, elapsed_time: float):
+            """
+            上传成功后上报上传信息并发送结果通知，合并为一个后台任务执行
+
+            :param second_auth: 是否秒传
+            :param elapsed_time: 耗时（秒）
+            """
+            send_upload_info(
+                file_sha1,
+                "",
+                second_auth,
+                "",
+                str(file_size),
+                target_name,
+                int(elapsed_time),
+            )
+            send_upload_result_notify(
+                success=True,
+                target_name=target_name,
+                file_size=file_size,
+                elapsed_time=elapsed_time,
+            )
+
         if not local_path.exists():
             logger.error(f"【P115Disk】本地文件不存在: {local_path}")
             return None
@@ -166,10 +382,6 @@ class P115DiskCore:
         # 获取目标目录ID
         target_pid = target_dir.fileid
 
-        # 计算文件特征值
-        file_size = local_path.stat().st_size
-        file_sha1 = self._p115_api._calc_sha1(local_path)
-
         # 清理缓存
         cache_id = self._p115_api._id_cache.get_id_by_dir(target_path.as_posix())
         if cache_id:
@@ -180,6 +392,49 @@ class P115DiskCore:
         logger.info(f"【P115Disk】开始上传: {local_path} -> {target_path}")
         progress_callback = transfer_process(local_path.as_posix())
 
+        # 等待秒传相关配置在上传开始时读取一次，等待循环中直接使用
+        skip_upload_wait_size = int(
+            configer.get_config("upload_module_skip_upload_wait_size") or 0
+        )
+        force_upload_wait_size = int(
+            configer.get_config("upload_module_force_upload_wait_size") or 0
+        )
+        wait_timeout = int(configer.get_config("upload_module_wait_timeout"))
+        default_wait_time = int(configer.get_config("upload_module_wait_time"))
+
+        # 计算文件特征值，文件只映射一次，供整体 SHA1、校验区间与分片上传共用
+        file_size = local_path.stat().st_size
+        local_file = open(local_path, "rb")
+        file_map: Optional[mmap] = None
+        try:
+            if file_size:
+                try:
+                    file_map = mmap(local_file.fileno(), 0, access=ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    # 部分网络或 FUSE 挂载不支持内存映射，回退为共享句柄读取
+                    logger.debug("【P115Disk】内存映射失败，使用文件句柄读取: %s", e)
+                # 整文件哈希与分片上传都按顺序读取，提示内核加大预读
+                if file_map is not None:
+                    if MADV_SEQUENTIAL is not None:
+                        file_map.madvise(MADV_SEQUENTIAL)
+                elif posix_fadvise is not None:
+                    posix_fadvise(
+                        local_file.fileno(), 0, 0, POSIX_FADV_SEQUENTIAL
+                    )
+            # 调用方已提供 SHA1 时跳过整文件哈希
+            if not file_sha1:
+                if file_map is not None:
+                    file_sha1 = sha1(file_map).hexdigest()
+                else:
+                    file_sha1 = _sha1_at(
+                        local_file.fileno(), 0, file_size
+                    ).hexdigest()
+        except Exception:
+            if file_map is not None:
+                file_map.close()
+            local_file.close()
+            raise
+
         try:
             wait_start_time = perf_counter()
             send_wait = False
@@ -188,7 +443,7 @@ class P115DiskCore:
                 # Step 1: 初始化上传
                 init_resp = None
                 init_max_retries = 3
-                init_retry_delay = 2
+                init_retry_delay = 1.0
                 for init_attempt in range(init_max_retries):
                     try:
                         init_resp = self._p115_api.client.upload_file_init(
@@ -206,8 +461,11 @@ class P115DiskCore:
                                 f"【P115Disk】初始化上传失败，"
                                 f"第 {init_attempt + 1}/{init_max_retries} 次重试: {e}"
                             )
+                            # 去相关抖动退避，避免多实例同时失败后同步重试
+                            init_retry_delay = min(
+                                60.0, uniform(1.0, init_retry_delay * 3)
+                            )
                             sleep(init_retry_delay)
-                            init_retry_delay *= 2
                         else:
                             logger.error(f"【P115Disk】初始化上传重试用尽: {e}")
                             return None
@@ -226,60 +484,34 @@ class P115DiskCore:
                 if init_resp.get("reuse"):
                     logger.info(f"【P115Disk】{target_name} 秒传成功")
                     progress_callback(100)
-                    end_time = perf_counter()
-                    elapsed_time = end_time - start_time
-                    send_upload_info(
-                        file_sha1,
-                        "",
-                        True,
-                        "",
-                        str(file_size),
-                        target_name,
-                        int(elapsed_time),
-                    )
-                    send_upload_result_notify(
-                        success=True,
-                        target_name=target_name,
-                        file_size=file_size,
-                        elapsed_time=elapsed_time,
+                    self._dispatch(
+                        send_upload_success, True, perf_counter() - start_time
                     )
                     return self._p115_api.get_item(target_path)
 
                 # 判断是等待秒传还是直接上传
-                upload_module_skip_upload_wait_size = int(
-                    configer.get_config("upload_module_skip_upload_wait_size") or 0
-                )
-                if (
-                    upload_module_skip_upload_wait_size != 0
-                    and file_size <= upload_module_skip_upload_wait_size
-                ):
+                if skip_upload_wait_size != 0 and file_size <= skip_upload_wait_size:
                     logger.info(
                         f"【P115Disk】文件大小 {file_size} 小于最低阈值，跳过等待流程: {target_name}"
                     )
                     break
 
-                if perf_counter() - wait_start_time > int(
-                    configer.get_config("upload_module_wait_timeout")
-                ):
+                if perf_counter() - wait_start_time > wait_timeout:
                     logger.warn(
                         f"【P115Disk】等待秒传超时，自动进行上传流程: {target_name}"
                     )
                     break
 
-                upload_module_force_upload_wait_size = int(
-                    configer.get_config("upload_module_force_upload_wait_size") or 0
-                )
-                if (
-                    upload_module_force_upload_wait_size != 0
-                    and file_size >= upload_module_force_upload_wait_size
-                ):
+                if force_upload_wait_size != 0 and file_size >= force_upload_wait_size:
                     logger.info(
                         f"【P115Disk】文件大小 {file_size} 大于最高阈值，强制等待流程: {target_name}"
                     )
-                    sleep(int(configer.get_config("upload_module_wait_time")))
+                    if self._wait_or_stopped(local_path, default_wait_time):
+                        logger.info(f"【P115Disk】{local_path} 上传已取消！")
+                        return None
                 else:
                     try:
-                        resp = self.p115_center.user_speed_status()
+                        resp = self._get_speed_status()
 
                         if resp.status != "slow":
                             logger.warn(
@@ -288,9 +520,6 @@ class P115DiskCore:
                             break
 
                         # 计算等待时间
-                        default_wait_time = int(
-                            configer.get_config("upload_module_wait_time")
-                        )
                         sleep_time = default_wait_time
                         fastest_speed = resp.fastest_user_speed_mbps
                         user_speed = resp.user_average_speed_mbps
@@ -307,9 +536,11 @@ class P115DiskCore:
                             f"【P115Disk】休眠 {sleep_time} 秒，等待秒传: {target_name}"
                         )
                         if not send_wait:
-                            send_upload_wait(target_name)
+                            self._dispatch(send_upload_wait, target_name)
                             send_wait = True
-                        sleep(sleep_time)
+                        if self._wait_or_stopped(local_path, sleep_time):
+                            logger.info(f"【P115Disk】{local_path} 上传已取消！")
+                            return None
                     except Exception as e:
                         logger.warn(f"【P115Disk】获取用户上传速度错误: {e}")
                         break
@@ -323,7 +554,8 @@ class P115DiskCore:
                         logger.warn(
                             f"【P115Disk】{target_name} 无法秒传，文件大小 {file_size} 大于等于阈值 {skip_upload_size}，跳过上传"
                         )
-                        send_upload_result_notify(
+                        self._dispatch(
+                            send_upload_result_notify,
                             success=False,
                             target_name=target_name,
                             file_size=file_size,
@@ -336,7 +568,8 @@ class P115DiskCore:
                         )
                 else:
                     logger.warn(f"【P115Disk】{target_name} 无法秒传，跳过上传")
-                    send_upload_result_notify(
+                    self._dispatch(
+                        send_upload_result_notify,
                         success=False,
                         target_name=target_name,
                         file_size=file_size,
@@ -353,6 +586,15 @@ class P115DiskCore:
                 logger.error(f"【P115Disk】上传信息不完整: {init_resp}")
                 return None
 
+            # 115 服务器回调头在获取上传信息后编码一次，合并分片重试时直接复用
+            headers = {
+                "X-oss-callback": b64encode_as_string(callback_info["callback"]),
+                "x-oss-callback-var": b64encode_as_string(
+                    callback_info["callback_var"]
+                ),
+                "x-oss-forbid-overwrite": "false",
+            }
+
             # Step 2: 获取OSS上传凭证
             (
                 endpoint,
@@ -371,8 +613,10 @@ class P115DiskCore:
                 access_key_secret=access_key_secret,
                 security_token=security_token,
             )
-            bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-            part_size = determine_part_size(file_size, preferred_size=10 * 1024 * 1024)
+            bucket = Bucket(
+                auth, endpoint, bucket_name, session=self._oss_session
+            )  # noqa
+            part_size = _part_size(file_size)
 
             logger.info(
                 f"【P115Disk】开始分片上传，分片大小: {part_size // 1024 // 1024}MB"
@@ -382,147 +626,160 @@ class P115DiskCore:
             upload_id = bucket.init_multipart_upload(
                 object_name, params={"encoding-type": "url", "sequential": ""}
             ).upload_id
+            # 刷新截止时间只在获取凭证时计算一次（提前 5 分钟刷新），分片上传前仅做时间比较
+            bucket_state = {
+                "bucket": bucket,
+                "refresh_at": token_expiration - timedelta(minutes=5),
+            }
+            token_lock = Lock()
+
+            def refresh_bucket(stale_bucket: Bucket) -> Bucket:
+                """
+                重新获取凭证并重建 bucket，多个分片同时触发时只刷新一次
+                """
+                with token_lock:
+                    if bucket_state["bucket"] is not stale_bucket:
+                        return bucket_state["bucket"]
+                    (
+                        new_endpoint,
+                        new_access_key_id,
+                        new_access_key_secret,
+                        new_security_token,
+                        new_expiration,
+                    ) = self._p115_api._get_oss_token()
+                    new_auth = StsAuth(
+                        access_key_id=new_access_key_id,
+                        access_key_secret=new_access_key_secret,
+                        security_token=new_security_token,
+                    )
+                    bucket_state["bucket"] = Bucket(
+                        new_auth, new_endpoint, bucket_name, session=self._oss_session
+                    )  # noqa
+                    bucket_state["refresh_at"] = new_expiration - timedelta(minutes=5)
+                    logger.info(
+                        f"【P115Disk】Token 刷新成功，新的过期时间: "
+                        f"{new_expiration.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+                    )
+                    return bucket_state["bucket"]
+
+            def upload_part(
+                part_number: int, offset: int, size: int
+            ) -> Optional[PartInfo]:
+                """
+                上传单个分片，数据取自文件内存映射，带重试机制处理 token 过期错误，
+                上传已取消时直接返回 None
+                """
+                if cancel_event.is_set():
+                    return None
+                current_bucket = bucket_state["bucket"]
+                # 检查 token 是否即将过期
+                if datetime.now(timezone.utc) >= bucket_state["refresh_at"]:
+                    logger.info("【P115Disk】Token 即将过期，正在刷新...")
+                    current_bucket = refresh_bucket(current_bucket)
+
+                # 从内存映射切片分片数据，无法映射时按偏移读取，重试时直接复用
+                data = read_bytes(offset, size)
+                max_retries = 2
+                for retry in range(max_retries):
+                    try:
+                        result = current_bucket.upload_part(
+                            object_name,
+                            upload_id,
+                            part_number,
+                            data=data,
+                        )
+                        return PartInfo(part_number, result.etag)
+                    except ServerError as e:
+                        # 检查是否是 token 过期错误
+                        error_code = getattr(e, "code", "")
+                        if (
+                            error_code in ("InvalidAccessKeyId", "SecurityTokenExpired")
+                            and retry < max_retries - 1
+                        ):
+                            logger.warn(
+                                f"【P115Disk】检测到 Token 过期错误 ({error_code})，"
+                                f"正在刷新并重试..."
+                            )
+                            current_bucket = refresh_bucket(current_bucket)
+                            continue
+                        raise
+
+            part_specs = [
+                (index + 1, offset, min(part_size, file_size - offset))
+                for index, offset in enumerate(range(0, file_size, part_size))
+            ]
             parts = []
+            uploaded_size = 0
+            # 取消状态由主线程在每个分片完成时检查后置位，分片线程只读取事件标志
+            cancel_event = Event()
+            max_workers = max(
+                int(configer.get_config("upload_module_parallel_parts") or 4), 1
+            )
 
-            # 逐个上传分片并更新进度
-            with open(local_path, "rb") as fileobj:
-                part_number = 1
-                offset = 0
-                while offset < file_size:
-                    # 检查是否取消上传
-                    if global_vars.is_transfer_stopped(local_path.as_posix()):
+            # 并发上传分片并更新进度
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="P115Disk-Upload"
+            ) as executor:
+                futures = {
+                    executor.submit(upload_part, *spec): spec[2] for spec in part_specs
+                }
+                for future in as_completed(futures):
+                    try:
+                        part = future.result()
+                    except Exception as e:
+                        # 其他错误或重试次数用尽，放弃上传
+                        logger.error(f"【P115Disk】上传分片失败: {str(e)}")
+                        cancel_event.set()
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        bucket_state["bucket"].abort_multipart_upload(
+                            object_name, upload_id
+                        )
+                        raise
+                    # 检查是否取消上传或服务已停止，分片线程检测到取消时返回 None
+                    if (
+                        part is None
+                        or self._stop_event.is_set()
+                        or global_vars.is_transfer_stopped(local_path.as_posix())
+                    ):
                         logger.info(f"【P115Disk】{local_path} 上传已取消！")
-                        bucket.abort_multipart_upload(object_name, upload_id)
+                        cancel_event.set()
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        bucket_state["bucket"].abort_multipart_upload(
+                            object_name, upload_id
+                        )
                         return None
-
-                    # 检查 token 是否即将过期（提前 5 分钟刷新）
-                    if self._p115_api._is_token_expiring(
-                        token_expiration, threshold_minutes=5
-                    ):
-                        logger.info("【P115Disk】Token 即将过期，正在刷新...")
-                        try:
-                            (
-                                endpoint,
-                                access_key_id,
-                                access_key_secret,
-                                security_token,
-                                token_expiration,
-                            ) = self._p115_api._get_oss_token()
-                            # 重新创建认证和 bucket 对象
-                            auth = StsAuth(
-                                access_key_id=access_key_id,
-                                access_key_secret=access_key_secret,
-                                security_token=security_token,
-                            )
-                            bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-                            logger.info(
-                                f"【P115Disk】Token 刷新成功，新的过期时间: "
-                                f"{token_expiration.strftime('%Y-%m-%d %H:%M:%S UTC')}"
-                            )
-                        except Exception as e:
-                            logger.error(f"【P115Disk】刷新 Token 失败: {str(e)}")
-                            bucket.abort_multipart_upload(object_name, upload_id)
-                            return None
-
-                    num_to_upload = min(part_size, file_size - offset)
-
-                    # 上传分片，带重试机制处理 token 过期错误
-                    max_retries = 2
-                    for retry in range(max_retries):
-                        try:
-                            result = bucket.upload_part(
-                                object_name,
-                                upload_id,
-                                part_number,
-                                data=SizedFileAdapter(fileobj, num_to_upload),
-                            )
-                            parts.append(PartInfo(part_number, result.etag))
-                            break  # 上传成功，跳出重试循环
-                        except ServerError as e:
-                            # 检查是否是 token 过期错误
-                            error_code = getattr(e, "code", "")
-                            if (
-                                error_code
-                                in ("InvalidAccessKeyId", "SecurityTokenExpired")
-                                and retry < max_retries - 1
-                            ):
-                                logger.warn(
-                                    f"【P115Disk】检测到 Token 过期错误 ({error_code})，"
-                                    f"正在刷新并重试..."
-                                )
-                                # 刷新 token
-                                (
-                                    endpoint,
-                                    access_key_id,
-                                    access_key_secret,
-                                    security_token,
-                                    token_expiration,
-                                ) = self._p115_api._get_oss_token()
-                                auth = StsAuth(
-                                    access_key_id=access_key_id,
-                                    access_key_secret=access_key_secret,
-                                    security_token=security_token,
-                                )
-                                bucket = Bucket(auth, endpoint, bucket_name)  # noqa
-                                # 需要重新定位文件指针
-                                fileobj.seek(offset)
-                                continue
-                            else:
-                                # 其他错误或重试次数用尽，放弃上传
-                                logger.error(f"【P115Disk】上传分片失败: {str(e)}")
-                                bucket.abort_multipart_upload(object_name, upload_id)
-                                raise
-
-                    # 更新偏移和分片号
-                    offset += num_to_upload
-                    part_number += 1
+                    parts.append(part)
 
                     # 实时更新进度
-                    progress = (offset * 100) / file_size
+                    uploaded_size += futures[future]
+                    progress = (uploaded_size * 100) / file_size
                     progress_callback(progress)
                     logger.debug(f"【P115Disk】上传进度: {progress:.1f}%")
 
+            # 分片按完成顺序收集，合并前需按分片号排序
+            parts.sort(key=lambda part: part.part_number)
+            bucket = bucket_state["bucket"]
+
             # 完成上传
             progress_callback(100)
 
             # Step 4: 完成OSS上传并回调115服务器
-            headers = {
-                "X-oss-callback": encode_callback(callback_info["callback"]),
-                "x-oss-callback-var": encode_callback(callback_info["callback_var"]),
-                "x-oss-forbid-overwrite": "false",
-            }
-
             result = bucket.complete_multipart_upload(
                 object_name, upload_id, parts, headers=headers
             )
 
             if result.status == 200:
                 logger.info(f"【P115Disk】{target_name} 上传成功")
-                end_time = perf_counter()
-                elapsed_time = end_time - start_time
-                send_upload_result_notify(
-                    success=True,
-                    target_name=target_name,
-                    file_size=file_size,
-                    elapsed_time=elapsed_time,
-                )
-                end_time = perf_counter()
-                elapsed_time = end_time - start_time
-                send_upload_info(
-                    file_sha1,
-                    "",
-                    False,
-                    "",
-                    str(file_size),
-                    target_name,
-                    int(elapsed_time),
+                self._dispatch(
+                    send_upload_success, False, perf_counter() - start_time
                 )
                 return self._p115_api.get_item(target_path)
             else:
                 logger.error(
                     f"【P115Disk】{target_name} 上传失败，状态码: {result.status}"
                 )
-                send_upload_result_notify(
+                self._dispatch(
+                    send_upload_result_notify,
                     success=False,
                     target_name=target_name,
                     file_size=file_size,
@@ -532,10 +789,15 @@ class P115DiskCore:
 
         except Exception as e:
             logger.error(f"【P115Disk】上传失败: {local_path} - {str(e)}")
-            send_upload_result_notify(
+            self._dispatch(
+                send_upload_result_notify,
                 success=False,
                 target_name=target_name,
                 file_size=file_size,
                 error_msg=f"未知错误: {str(e)}",
             )
             return None
+        finally:
+            if file_map is not None:
+                file_map.close()
+            local_file.close()
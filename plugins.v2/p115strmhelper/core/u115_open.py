@@ -3,6 +3,8 @@ from itertools import batched
 from os import PathLike
 from random import randint
 from datetime import datetime, timezone
+from hashlib import sha1
+from mmap import mmap, ACCESS_READ
 from pathlib import Path
 from shutil import rmtree
 from threading import Lock
@@ -31,7 +33,6 @@ from p115center.schemas import UploadInfo
 from p115client import P115Client
 from p115client.tool.attr import normalize_attr
 from p115client.type import DirNode
-from cryptography.hazmat.primitives import hashes
 from diskcache import Deque
 
 from app import schemas
@@ -288,22 +289,32 @@ class U115OpenHelper:
             return None
 
     @staticmethod
-    def _calc_sha1(filepath: Path, size: Optional[int] = None) -> str:
+    def _calc_sha1_with_preid(filepath: Path, preid_size: int) -> Tuple[str, str]:
         """
-        计算文件 SHA1
+        一次读取文件同时计算整体 SHA1 与前 preid_size 字节的 SHA1
 
         :param filepath: 文件路径
-        :param size: 前多少字节
+        :param preid_size: 计算 preid 的前多少字节
+
+        :return: (文件 SHA1, preid)
         """
-        sha1 = hashes.Hash(hashes.SHA1())
         with open(filepath, "rb") as f:
-            if size:
-                chunk = f.read(size)
-                sha1.update(chunk)
-            else:
-                while chunk := f.read(8192):
-                    sha1.update(chunk)
-        return sha1.finalize().hex()
+            try:
+                mm = mmap(f.fileno(), 0, access=ACCESS_READ)
+            except (OSError, ValueError):
+                # 空文件或不支持内存映射的挂载，按块读取
+                hasher = sha1(f.read(preid_size))
+                file_preid = hasher.hexdigest()
+                while chunk := f.read(1 << 20):
+                    hasher.update(chunk)
+                return hasher.hexdigest(), file_preid
+            with mm, memoryview(mm) as view:
+                with view[:preid_size] as head:
+                    hasher = sha1(head)
+                file_preid = hasher.hexdigest()
+                with view[preid_size:] as tail:
+                    hasher.update(tail)
+                return hasher.hexdigest(), file_preid
 
     @staticmethod
     def _can_write_db(path: Path) -> bool:
@@ -343,9 +354,6 @@ class U115OpenHelper:
         文件上传
         """
 
-        def encode_callback(cb: str) -> str:
-            return b64encode_as_string(cb)
-
         def send_upload_info(
             file_sha1: Optional[str],
             first_sha1: Optional[str],
@@ -435,13 +443,24 @@ class U115OpenHelper:
         target_path = Path(target_dir.path) / target_name
         # 计算文件特征值
         file_size = local_path.stat().st_size
-        file_sha1 = self._calc_sha1(local_path)
-        file_preid = self._calc_sha1(local_path, 128 * 1024 * 1024)
+        file_sha1, file_preid = self._calc_sha1_with_preid(
+            local_path, 128 * 1024 * 1024
+        )
 
         # 获取目标目录CID
         target_cid = target_dir.fileid
         target_param = f"U_1_{target_cid}"
 
+        # 等待秒传相关配置在上传开始时读取一次，等待循环中直接使用
+        skip_upload_wait_size = int(
+            configer.get_config("upload_module_skip_upload_wait_size") or 0
+        )
+        force_upload_wait_size = int(
+            configer.get_config("upload_module_force_upload_wait_size") or 0
+        )
+        wait_timeout = int(configer.get_config("upload_module_wait_timeout"))
+        default_wait_time = int(configer.get_config("upload_module_wait_time"))
+
         wait_start_time = perf_counter()
         send_wait = False
         while True:
@@ -488,9 +507,7 @@ class U115OpenHelper:
                     # 取2392148-2392298之间的内容(包含2392148、2392298)的sha1
                     f.seek(start)
                     chunk = f.read(end - start + 1)
-                    sha1 = hashes.Hash(hashes.SHA1())
-                    sha1.update(chunk)
-                    sign_val = sha1.finalize().hex().upper()
+                    sign_val = sha1(chunk).hexdigest().upper()
                 second_sha1 = sign_val
                 # 重新初始化请求
                 # sign_key，sign_val(根据sign_check计算的值大写的sha1值)
@@ -581,37 +598,23 @@ class U115OpenHelper:
                 return U115OpenHelper._delay_get_item(target_path)
 
             # 判断是等待秒传还是直接上传
-            upload_module_skip_upload_wait_size = int(
-                configer.get_config("upload_module_skip_upload_wait_size") or 0
-            )
-            if (
-                upload_module_skip_upload_wait_size != 0
-                and file_size <= upload_module_skip_upload_wait_size
-            ):
+            if skip_upload_wait_size != 0 and file_size <= skip_upload_wait_size:
                 logger.info(
                     f"【P115Open】文件大小 {file_size} 小于最低阈值，跳过等待流程: {target_name}"
                 )
                 break
 
-            if perf_counter() - wait_start_time > int(
-                configer.get_config("upload_module_wait_timeout")
-            ):
+            if perf_counter() - wait_start_time > wait_timeout:
                 logger.warn(
                     f"【P115Open】等待秒传超时，自动进行上传流程: {target_name}"
                 )
                 break
 
-            upload_module_force_upload_wait_size = int(
-                configer.get_config("upload_module_force_upload_wait_size") or 0
-            )
-            if (
-                upload_module_force_upload_wait_size != 0
-                and file_size >= upload_module_force_upload_wait_size
-            ):
+            if force_upload_wait_size != 0 and file_size >= force_upload_wait_size:
                 logger.info(
                     f"【P115Open】文件大小 {file_size} 大于最高阈值，强制等待流程: {target_name}"
                 )
-                sleep(int(configer.get_config("upload_module_wait_time")))
+                sleep(default_wait_time)
             else:
                 try:
                     resp = self.p115_center.user_speed_status()
@@ -623,9 +626,6 @@ class U115OpenHelper:
                         break
 
                     # 计算等待时间
-                    default_wait_time = int(
-                        configer.get_config("upload_module_wait_time")
-                    )
                     sleep_time = default_wait_time
                     fastest_speed = resp.fastest_user_speed_mbps
                     user_speed = resp.user_average_speed_mbps
@@ -749,8 +749,8 @@ class U115OpenHelper:
                 return None
 
             parts = []
-            # 逐个上传分片
-            with open(local_path, "rb") as fileobj:
+            # 逐个上传分片，HTTP 层按 8KB 小块读取分片数据，使用 1MB 缓冲减少系统调用
+            with open(local_path, "rb", buffering=1 << 20) as fileobj:
                 part_number = 1
                 offset = 0
                 while offset < file_size:
@@ -844,8 +844,8 @@ class U115OpenHelper:
 
         # 请求头
         headers = {
-            "X-oss-callback": encode_callback(callback["callback"]),
-            "x-oss-callback-var": encode_callback(callback["callback_var"]),
+            "X-oss-callback": b64encode_as_string(callback["callback"]),
+            "x-oss-callback-var": b64encode_as_string(callback["callback_var"]),
             "x-oss-forbid-overwrite": "false",
         }
         try:
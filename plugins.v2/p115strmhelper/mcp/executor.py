@@ -0,0 +1,54 @@
+"""
+MCP 同步调用卸载：使用独立且有上限的线程池，避免占用事件循环默认线程池
+"""
+
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Optional
+
+_MAX_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    获取 MCP 线程池，不存在时创建
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_MAX_WORKERS, thread_name_prefix="p115-mcp"
+                )
+    return _executor
+
+
+async def run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    在 MCP 线程池中执行同步函数，行为同 asyncio.to_thread（保留 contextvars）
+
+    :param func: 同步函数。
+    :param args: 位置参数。
+    :return: 函数返回值。
+    """
+    ctx = copy_context()
+    return await get_running_loop().run_in_executor(
+        _get_executor(), partial(ctx.run, func, *args)
+    )
+
+
+def shutdown_executor() -> None:
+    """
+    关闭 MCP 线程池，不等待正在执行的任务；下次调用时会重新创建
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -2,11 +2,133 @@
 MCP JSON-RPC 方法分发：initialize, tools/list, tools/call, resources/list, resources/read
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from orjson import Fragment, dumps as orjson_dumps
 
 from .tools import INTERNAL_TOOLS, TOOLS, run_tool
 from .resources import RESOURCES, read_resource
 
+# 以下结果在模块加载后不再变化，预先序列化一次，响应时由 orjson 原样拼接
+_INITIALIZE_RESULT = Fragment(
+    orjson_dumps(
+        {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {"listChanged": False},
+                "resources": {"subscribe": False, "listChanged": False},
+            },
+            "serverInfo": {"name": "P115StrmHelper", "version": "1.0.0"},
+        }
+    )
+)
+_TOOLS_LIST_RESULT = Fragment(
+    orjson_dumps(
+        {"tools": [t["def"] for t in TOOLS] + [t["def"] for t in INTERNAL_TOOLS]}
+    )
+)
+_RESOURCES_LIST_RESULT = Fragment(
+    orjson_dumps({"resources": [r["def"] for r in RESOURCES]})
+)
+
+# 固定内容的错误响应模板，返回时仅补充请求 id
+_ERR_INVALID_REQUEST: Dict[str, Any] = {
+    "jsonrpc": "2.0",
+    "error": {"code": -32600, "message": "Invalid Request"},
+}
+_ERR_MISSING_TOOL_NAME: Dict[str, Any] = {
+    "jsonrpc": "2.0",
+    "error": {"code": -32602, "message": "Missing tool name"},
+}
+_ERR_MISSING_URI: Dict[str, Any] = {
+    "jsonrpc": "2.0",
+    "error": {"code": -32602, "message": "Missing uri"},
+}
+
+
+async def _handle_initialize(
+    api: Any, servicer: Any, params: Dict[str, Any], request_id: Any
+) -> Optional[Dict]:
+    """
+    initialize：返回协议版本与服务能力
+    """
+    return {"jsonrpc": "2.0", "id": request_id, "result": _INITIALIZE_RESULT}
+
+
+async def _handle_tools_list(
+    api: Any, servicer: Any, params: Dict[str, Any], request_id: Any
+) -> Optional[Dict]:
+    """
+    tools/list：返回全部工具定义
+    """
+    return {"jsonrpc": "2.0", "id": request_id, "result": _TOOLS_LIST_RESULT}
+
+
+async def _handle_tools_call(
+    api: Any, servicer: Any, params: Dict[str, Any], request_id: Any
+) -> Optional[Dict]:
+    """
+    tools/call：执行指定工具
+    """
+    name = params.get("name")
+    arguments = params.get("arguments") or {}
+    if not name:
+        return {**_ERR_MISSING_TOOL_NAME, "id": request_id}
+    content = await run_tool(api, servicer, name, arguments)
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": {
+            "content": [{"type": "text", "text": content}],
+            "isError": False,
+        },
+    }
+
+
+async def _handle_resources_list(
+    api: Any, servicer: Any, params: Dict[str, Any], request_id: Any
+) -> Optional[Dict]:
+    """
+    resources/list：返回全部资源定义
+    """
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": _RESOURCES_LIST_RESULT,
+    }
+
+
+async def _handle_resources_read(
+    api: Any, servicer: Any, params: Dict[str, Any], request_id: Any
+) -> Optional[Dict]:
+    """
+    resources/read：读取指定资源
+    """
+    uri = params.get("uri")
+    if not uri:
+        return {**_ERR_MISSING_URI, "id": request_id}
+    content = await read_resource(api, uri)
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": {
+            "contents": [
+                {"uri": uri, "mimeType": "application/json", "text": content}
+            ],
+        },
+    }
+
+
+_HANDLERS: Dict[
+    str, Callable[[Any, Any, Dict[str, Any], Any], Awaitable[Optional[Dict]]]
+] = {
+    "initialize": _handle_initialize,
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+    "resources/list": _handle_resources_list,
+    "resources/read": _handle_resources_read,
+}
+
 
 async def dispatch_rpc(
     api: Any,
@@ -17,6 +139,7 @@ async def dispatch_rpc(
 ) -> Optional[Dict]:
     """
     根据 method 调用对应逻辑，返回 JSON-RPC 响应体（dict），供上层序列化为 JSON。
+    响应中可能含预先序列化的 orjson.Fragment，须使用 orjson 序列化。
 
     :param api: 插件 Api 实例。
     :param servicer: 插件 ServiceHelper 实例。
@@ -26,78 +149,11 @@ async def dispatch_rpc(
     :return: 响应体 dict，或 None（不向客户端回写时）。
     """
     if not method:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {"code": -32600, "message": "Invalid Request"},
-        }
-
-    if method == "initialize":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {"listChanged": False},
-                    "resources": {"subscribe": False, "listChanged": False},
-                },
-                "serverInfo": {"name": "P115StrmHelper", "version": "1.0.0"},
-            },
-        }
-
-    if method == "tools/list":
-        all_defs = [t["def"] for t in TOOLS] + [t["def"] for t in INTERNAL_TOOLS]
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {"tools": all_defs},
-        }
+        return {**_ERR_INVALID_REQUEST, "id": request_id}
 
-    if method == "tools/call":
-        name = (params or {}).get("name")
-        arguments = (params or {}).get("arguments") or {}
-        if not name:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {"code": -32602, "message": "Missing tool name"},
-            }
-        content = await run_tool(api, servicer, name, arguments)
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "content": [{"type": "text", "text": content}],
-                "isError": False,
-            },
-        }
-
-    if method == "resources/list":
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {"resources": [r["def"] for r in RESOURCES]},
-        }
-
-    if method == "resources/read":
-        uri = (params or {}).get("uri")
-        if not uri:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {"code": -32602, "message": "Missing uri"},
-            }
-        content = await read_resource(api, uri)
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {
-                "contents": [
-                    {"uri": uri, "mimeType": "application/json", "text": content}
-                ],
-            },
-        }
+    handler = _HANDLERS.get(method)
+    if handler is not None:
+        return await handler(api, servicer, params or {}, request_id)
 
     return {
         "jsonrpc": "2.0",
@@ -2,8 +2,9 @@
 MCP 服务端：SSE 传输 + JSON-RPC 分发
 """
 
-from asyncio import CancelledError, Queue, TimeoutError, wait_for
-from typing import Any, Dict
+from asyncio import CancelledError, Condition, TimeoutError, sleep
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
 from uuid import uuid4
 
 from fastapi import Request
@@ -14,18 +15,141 @@ from orjson import (
 )
 from starlette.responses import Response, StreamingResponse
 
+from .executor import shutdown_executor
 from .handlers import dispatch_rpc
 
+try:
+    from asyncio import timeout as async_timeout
+except ImportError:
+    from async_timeout import timeout as async_timeout
 
-def _sse_message(event: str, data: str) -> str:
+
+# message 事件的固定前后缀
+_MESSAGE_PREFIX = b"event: message\ndata: "
+_MESSAGE_SUFFIX = b"\n\n"
+
+
+def _sse_message(event: bytes, data: bytes) -> bytes:
     """
     构造一条 SSE 消息。
 
     :param event: 事件名。
-    :param data: 数据内容。
-    :return: 格式化为 "event: x\\ndata: y\\n\\n" 的字符串。
+    :param data: 数据内容（已编码的 UTF-8 字节）。
+    :return: 格式化为 "event: x\\ndata: y\\n\\n" 的字节串。
+    """
+    return b"".join((b"event: ", event, b"\ndata: ", data, b"\n\n"))
+
+
+def _sse_messages(bodies: List[bytes]) -> bytes:
     """
-    return f"event: {event}\ndata: {data}\n\n"
+    将多条消息体构造为连续的 message 事件，一次拼接完成，每条消息体仅复制一次。
+
+    :param bodies: 消息体列表（已编码的 UTF-8 字节）。
+    :return: 拼接后的 SSE 字节串。
+    """
+    parts = []
+    for body in bodies:
+        parts += (_MESSAGE_PREFIX, body, _MESSAGE_SUFFIX)
+    return b"".join(parts)
+
+
+# 心跳消息内容固定，预先构建
+_PING_MESSAGE = _sse_message(b"message", orjson_dumps({"ping": True}))
+
+# 单次写出时最多合并的消息数，限制队头等待
+_MAX_BATCH_MESSAGES = 16
+
+# SSE 响应头：禁用缓存、代理缓冲与压缩，保证消息即时到达客户端
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+    "Content-Encoding": "identity",
+}
+
+# 单个会话最多积压的待发送消息数，超过后生产者等待消费者取走消息
+_MAX_PENDING_MESSAGES = 64
+
+# 会话积压已满时生产者的最长等待时间（秒），超时返回 503
+_PUT_TIMEOUT = 30.0
+
+# 空闲后收到首条消息时，再等待该时长（秒）收集紧随其后的消息一并写出
+_BATCH_WINDOW = 0.005
+
+# 请求未携带 params 时共用的空参数（下游只读）
+_EMPTY_PARAMS: Dict[str, Any] = {}
+
+# 请求体无法解析时的固定 JSON-RPC 错误响应
+_PARSE_ERROR_BODY = orjson_dumps(
+    {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+)
+
+
+class _SessionQueue:
+    """
+    SSE 会话消息队列：有上限的 deque + Condition，满时生产者等待，空时消费者等待
+    """
+
+    __slots__ = ("messages", "maxsize", "_cond")
+
+    def __init__(self, maxsize: int = _MAX_PENDING_MESSAGES):
+        """
+        :param maxsize: 最多积压的消息数，可运行时调整。
+        """
+        self.messages: Deque[bytes] = deque()
+        self.maxsize = maxsize
+        self._cond = Condition()
+
+    async def put(self, body: bytes, timeout: float) -> bool:
+        """
+        写入一条消息，积压已满时等待。
+
+        :param body: JSON-RPC 响应体。
+        :param timeout: 最长等待时间（秒）。
+        :return: 是否写入成功（等待超时为 False）。
+        """
+        async with self._cond:
+            if len(self.messages) >= self.maxsize:
+                try:
+                    async with async_timeout(timeout):
+                        await self._cond.wait_for(
+                            lambda: len(self.messages) < self.maxsize
+                        )
+                except TimeoutError:
+                    return False
+            self.messages.append(body)
+            self._cond.notify_all()
+        return True
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        等待队列中出现消息。
+
+        :param timeout: 最长等待时间（秒）。
+        :return: 是否有消息（等待超时为 False）。
+        """
+        async with self._cond:
+            if self.messages:
+                return True
+            try:
+                async with async_timeout(timeout):
+                    await self._cond.wait_for(lambda: bool(self.messages))
+            except TimeoutError:
+                return False
+        return True
+
+    async def drain(self, limit: int) -> List[bytes]:
+        """
+        取出至多 limit 条消息，并唤醒等待写入的生产者。
+
+        :param limit: 最多取出的消息数。
+        :return: 消息列表。
+        """
+        async with self._cond:
+            messages = self.messages
+            batch = [messages.popleft() for _ in range(min(limit, len(messages)))]
+            self._cond.notify_all()
+        return batch
 
 
 class MCPManager:
@@ -41,8 +165,17 @@ class MCPManager:
         self._api = api
         self._servicer = servicer
         self._endpoint = "/mcp/messages"
-        # session_id -> Queue of JSON-RPC response bodies (str)
-        self._sessions: Dict[str, Queue] = {}
+        # session_id -> 待发送的 JSON-RPC 响应体队列
+        self._sessions: Dict[str, _SessionQueue] = {}
+        # (root_path, 请求路径) -> 已编码的 "消息路径?session_id=" 前缀
+        self._endpoint_prefixes: Dict[Tuple[str, str], bytes] = {}
+
+    @staticmethod
+    def close() -> None:
+        """
+        关闭 MCP 线程池
+        """
+        shutdown_executor()
 
     async def handle_sse(self, request: Request):
         """
@@ -56,31 +189,34 @@ class MCPManager:
         path = (
             request.url.path if getattr(request, "url", None) else scope.get("path", "")
         ) or ""
-        if path.rstrip("/").endswith("mcp/sse"):
-            base = path.rsplit("mcp/sse", 1)[0].rstrip("/")
-        else:
-            base = scope.get("root_path", "").rstrip("/")
-        message_path = (base or "") + self._endpoint
+        root_path = scope.get("root_path", "")
+        prefix = self._endpoint_prefixes.get((root_path, path))
+        if prefix is None:
+            if path.rstrip("/").endswith("mcp/sse"):
+                base = path.rsplit("mcp/sse", 1)[0].rstrip("/")
+            else:
+                base = root_path.rstrip("/")
+            prefix = f"{base or ''}{self._endpoint}?session_id=".encode()
+            self._endpoint_prefixes[(root_path, path)] = prefix
         session_id = uuid4().hex
-        self._sessions[session_id] = Queue()
-        endpoint_url = f"{message_path}?session_id={session_id}"
+        queue = self._sessions[session_id] = _SessionQueue()
+        endpoint_url = prefix + session_id.encode()
         apikey = request.query_params.get("apikey")
         if apikey:
-            endpoint_url += f"&apikey={apikey}"
+            endpoint_url += f"&apikey={apikey}".encode()
 
         async def event_stream():
             try:
-                yield _sse_message("endpoint", endpoint_url)
+                yield _sse_message(b"endpoint", endpoint_url)
                 while True:
-                    try:
-                        body = await wait_for(
-                            self._sessions[session_id].get(), timeout=300.0
-                        )
-                        yield _sse_message("message", body)
-                    except TimeoutError:
-                        yield _sse_message(
-                            "message", orjson_dumps({"ping": True}).decode()
-                        )
+                    if not queue.messages:
+                        if not await queue.wait(300.0):
+                            yield _PING_MESSAGE
+                            continue
+                        if len(queue.messages) < _MAX_BATCH_MESSAGES:
+                            await sleep(_BATCH_WINDOW)
+                    # 取出已就绪的消息，合并为一次写出
+                    yield _sse_messages(await queue.drain(_MAX_BATCH_MESSAGES))
             except CancelledError:
                 pass
             finally:
@@ -89,11 +225,7 @@ class MCPManager:
         return StreamingResponse(
             event_stream(),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            },
+            headers=_SSE_HEADERS,
         )
 
     async def handle_messages(self, request: Request):
@@ -113,21 +245,24 @@ class MCPManager:
             body = await request.body()
             msg = orjson_loads(body) if body else {}
         except OrjsonJSONDecodeError:
-            return Response("Could not parse message", status_code=400)
+            return Response(
+                _PARSE_ERROR_BODY, status_code=400, media_type="application/json"
+            )
         method = msg.get("method")
         req_id = msg.get("id")
-        params = msg.get("params") or {}
+        params = msg.get("params") or _EMPTY_PARAMS
         try:
             result = await dispatch_rpc(
                 self._api, self._servicer, method, params, req_id
             )
-            if result is not None:
-                await queue.put(orjson_dumps(result).decode())
+            body = orjson_dumps(result) if result is not None else None
         except Exception as e:
             err = {
                 "jsonrpc": "2.0",
                 "id": req_id,
                 "error": {"code": -32603, "message": str(e)},
             }
-            await queue.put(orjson_dumps(err).decode())
+            body = orjson_dumps(err)
+        if body is not None and not await queue.put(body, _PUT_TIMEOUT):
+            return Response("Session backlog full", status_code=503)
         return Response("Accepted", status_code=202)
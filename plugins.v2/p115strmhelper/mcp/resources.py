@@ -2,10 +2,13 @@
 MCP 资源定义与读取：p115://status, p115://storage, p115://fuse/status, p115://sync/history
 """
 
-from asyncio import to_thread
 from typing import Any, Dict, List
 
-from orjson import dumps as orjson_dumps
+from orjson import OPT_SERIALIZE_NUMPY, dumps as orjson_dumps
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
+
+from .executor import run_in_pool
 
 
 RESOURCES: List[Dict[str, Any]] = [
@@ -40,18 +43,36 @@ RESOURCES: List[Dict[str, Any]] = [
 ]
 
 
+def _default(obj: Any) -> Any:
+    """
+    orjson 无法直接序列化对象时的回退：Pydantic 模型转为 dict，其余转为字符串。
+
+    :param obj: 待序列化对象。
+    :return: orjson 可序列化的对象。
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    return str(obj)
+
+
 def _dump(obj: Any) -> str:
     """
     将对象序列化为 JSON 字符串。
 
-    :param obj: 支持 model_dump()、dict() 或普通可序列化对象。
+    :param obj: 支持 Pydantic 模型、dict() 或普通可序列化对象。
     :return: UTF-8 JSON 字符串。
     """
-    if hasattr(obj, "model_dump"):
-        return orjson_dumps(obj.model_dump(), default=str).decode()
-    if hasattr(obj, "dict"):
-        return orjson_dumps(obj.dict(), default=str).decode()
-    return orjson_dumps(obj, default=str).decode()
+    if isinstance(obj, BaseModel):
+        # Pydantic v2 由 Rust 侧一次遍历直接生成 JSON，含无法序列化字段时回退
+        try:
+            return obj.model_dump_json()
+        except PydanticSerializationError:
+            pass
+    return orjson_dumps(
+        obj, default=_default, option=OPT_SERIALIZE_NUMPY
+    ).decode()
 
 
 async def read_resource(api: Any, uri: str) -> str:
@@ -63,15 +84,15 @@ async def read_resource(api: Any, uri: str) -> str:
     :return: 资源内容的 JSON 字符串。
     """
     if uri == "p115://status":
-        r = await to_thread(api.get_status_api)
+        r = await run_in_pool(api.get_status_api)
         return _dump(r)
     if uri == "p115://storage":
-        r = await to_thread(api.get_user_storage_status)
+        r = await run_in_pool(api.get_user_storage_status)
         return _dump(r)
     if uri == "p115://fuse/status":
-        r = await to_thread(api.fuse_status_api)
+        r = await run_in_pool(api.fuse_status_api)
         return _dump(r)
     if uri == "p115://sync/history":
-        r = await to_thread(api.get_sync_del_history, 1, 20)
+        r = await run_in_pool(api.get_sync_del_history, 1, 20)
         return _dump(r)
     return orjson_dumps({"error": f"Unknown resource: {uri}"}).decode()
@@ -1,37 +1,57 @@
 """
-MCP 工具定义与执行：包装插件 Api 的 tools + 非 Api 暴露的 INTERNAL_TOOLS，同步调用用 to_thread
+MCP 工具定义与执行：包装插件 Api 的 tools + 非 Api 暴露的 INTERNAL_TOOLS，同步调用用 run_in_pool
 """
 
-from asyncio import to_thread
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List
 
-from orjson import dumps as orjson_dumps
+from orjson import OPT_SERIALIZE_NUMPY, dumps as orjson_dumps
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
 
 from ..helper.clean import Cleaner
 from ..schemas.browse import BrowseDirParams
 from ..schemas.fuse import FuseMountPayload
 from ..schemas.offline import AddOfflineTaskPayload, OfflineTasksPayload
 from ..schemas.strm_api import ManualTransferPayload
+from .executor import run_in_pool
 
-# 工具定义列表：每项 {"def": { name, description, inputSchema } }，handler 在 run_tool 的 handlers 中
+# 工具定义列表：每项 {"def": { name, description, inputSchema } }，handler 在 _SIMPLE_TOOLS / _HANDLERS 中
 TOOLS: List[Dict[str, Any]] = []
 
 # 非 Api 暴露的 tools：不经过 api.py，直接依赖 servicer，每项 {"def": {...}, "handler": async (servicer, arguments) -> Any}
 INTERNAL_TOOLS: List[Dict[str, Any]] = []
 
 
+def _default(obj: Any) -> Any:
+    """
+    orjson 无法直接序列化对象时的回退：Pydantic 模型转为 dict，其余转为字符串。
+
+    :param obj: 待序列化对象。
+    :return: orjson 可序列化的对象。
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    return str(obj)
+
+
 def _dump(obj: Any) -> str:
     """
     将对象序列化为 JSON 字符串。
 
-    :param obj: 支持 model_dump()、dict() 或普通可序列化对象。
+    :param obj: 支持 Pydantic 模型、dict() 或普通可序列化对象。
     :return: UTF-8 JSON 字符串。
     """
-    if hasattr(obj, "model_dump"):
-        return orjson_dumps(obj.model_dump(), default=str).decode()
-    if hasattr(obj, "dict"):
-        return orjson_dumps(obj.dict(), default=str).decode()
-    return orjson_dumps(obj, default=str).decode()
+    if isinstance(obj, BaseModel):
+        # Pydantic v2 由 Rust 侧一次遍历直接生成 JSON，含无法序列化字段时回退
+        try:
+            return obj.model_dump_json()
+        except PydanticSerializationError:
+            pass
+    return orjson_dumps(
+        obj, default=_default, option=OPT_SERIALIZE_NUMPY
+    ).decode()
 
 
 async def run_tool(
@@ -46,63 +66,28 @@ async def run_tool(
     :param arguments: 工具参数字典。
     :return: 序列化后的 JSON 字符串（成功为结果，失败为含 error 的 dict）。
     """
-    internal_handlers = {t["def"]["name"]: t["handler"] for t in INTERNAL_TOOLS}
-    if name in internal_handlers:
-        if servicer is None:
-            return _dump({"error": "Internal tools require servicer"})
-        try:
-            result = await internal_handlers[name](servicer, arguments)
-            return _dump(result)
-        except Exception as e:
-            return _dump({"error": str(e)})
-
-    handlers = {
-        "get_plugin_status": _get_plugin_status,
-        "get_storage_status": _get_storage_status,
-        "browse_directory": _browse_directory,
-        "trigger_full_sync": _trigger_full_sync,
-        "trigger_share_sync": _trigger_share_sync,
-        "add_share_transfer": _add_share_transfer,
-        "manual_pan_transfer": _manual_pan_transfer,
-        "get_offline_tasks": _get_offline_tasks,
-        "add_offline_task": _add_offline_task,
-        "clear_id_path_cache": _clear_id_path_cache,
-        "clear_increment_skip_cache": _clear_increment_skip_cache,
-        "get_sync_delete_history": _get_sync_delete_history,
-        "fuse_mount": _fuse_mount,
-        "fuse_unmount": _fuse_unmount,
-        "get_fuse_status": _get_fuse_status,
-        "trigger_full_sync_db": _trigger_full_sync_db,
-        "check_life_event_status": _check_life_event_status,
-    }
-    fn = handlers.get(name)
-    if not fn:
-        return _dump({"error": f"Unknown tool: {name}"})
+    attr = _SIMPLE_TOOLS.get(name)
+    if attr is None:
+        fn = _INTERNAL_HANDLERS.get(name)
+        if fn is not None:
+            if servicer is None:
+                return _dump({"error": "Internal tools require servicer"})
+            target = servicer
+        else:
+            fn = _HANDLERS.get(name)
+            if fn is None:
+                return _dump({"error": f"Unknown tool: {name}"})
+            target = api
     try:
-        result = await fn(api, arguments)
+        if attr is not None:
+            result = await run_in_pool(getattr(api, attr))
+        else:
+            result = await fn(target, arguments)
         return _dump(result)
     except Exception as e:
         return _dump({"error": str(e)})
 
 
-async def _get_plugin_status(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 插件状态响应。
-    """
-    return await to_thread(api.get_status_api)
-
-
-async def _get_storage_status(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 115 存储空间信息。
-    """
-    return await to_thread(api.get_user_storage_status)
-
-
 async def _browse_directory(api: Any, args: Dict) -> Any:
     """
     :param api: 插件 Api 实例。
@@ -112,25 +97,7 @@ async def _browse_directory(api: Any, args: Dict) -> Any:
     params = BrowseDirParams(
         path=args.get("path", "/"), is_local=args.get("is_local", False)
     )
-    return await to_thread(api.browse_dir_api, params)
-
-
-async def _trigger_full_sync(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 全量同步触发结果。
-    """
-    return await to_thread(api.trigger_full_sync_api)
-
-
-async def _trigger_share_sync(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 分享同步触发结果。
-    """
-    return await to_thread(api.trigger_share_sync_api)
+    return await run_in_pool(api.browse_dir_api, params)
 
 
 async def _add_share_transfer(api: Any, args: Dict) -> Any:
@@ -139,7 +106,7 @@ async def _add_share_transfer(api: Any, args: Dict) -> Any:
     :param args: 含 share_url。
     :return: 添加分享转存结果。
     """
-    return await to_thread(api.add_transfer_share, args.get("share_url", ""))
+    return await run_in_pool(api.add_transfer_share, args.get("share_url", ""))
 
 
 async def _manual_pan_transfer(api: Any, args: Dict) -> Any:
@@ -149,7 +116,7 @@ async def _manual_pan_transfer(api: Any, args: Dict) -> Any:
     :return: 手动整理触发结果。
     """
     payload = ManualTransferPayload(path=args.get("path", ""))
-    return await to_thread(api.manual_transfer_api, payload)
+    return await run_in_pool(api.manual_transfer_api, payload)
 
 
 async def _get_offline_tasks(api: Any, args: Dict) -> Any:
@@ -159,7 +126,7 @@ async def _get_offline_tasks(api: Any, args: Dict) -> Any:
     :return: 离线任务列表。
     """
     payload = OfflineTasksPayload(page=args.get("page", 1), limit=args.get("limit", 10))
-    return await to_thread(api.offline_tasks_api, payload)
+    return await run_in_pool(api.offline_tasks_api, payload)
 
 
 async def _add_offline_task(api: Any, args: Dict) -> Any:
@@ -169,25 +136,7 @@ async def _add_offline_task(api: Any, args: Dict) -> Any:
     :return: 添加离线任务结果。
     """
     payload = AddOfflineTaskPayload(links=args.get("links", []), path=args.get("path"))
-    return await to_thread(api.add_offline_task_api, payload)
-
-
-async def _clear_id_path_cache(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 清理结果。
-    """
-    return await to_thread(api.clear_id_path_cache_api)
-
-
-async def _clear_increment_skip_cache(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 清理结果。
-    """
-    return await to_thread(api.clear_increment_skip_cache_api)
+    return await run_in_pool(api.add_offline_task_api, payload)
 
 
 async def _get_sync_delete_history(api: Any, args: Dict) -> Any:
@@ -196,7 +145,7 @@ async def _get_sync_delete_history(api: Any, args: Dict) -> Any:
     :param args: 含 page、limit。
     :return: 同步删除历史。
     """
-    return await to_thread(
+    return await run_in_pool(
         api.get_sync_del_history,
         args.get("page", 1),
         args.get("limit", 20),
@@ -213,43 +162,7 @@ async def _fuse_mount(api: Any, args: Dict) -> Any:
         mountpoint=args.get("mountpoint", ""),
         readdir_ttl=float(args.get("readdir_ttl", 60)),
     )
-    return await to_thread(api.fuse_mount_api, payload)
-
-
-async def _fuse_unmount(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: FUSE 卸载结果。
-    """
-    return await to_thread(api.fuse_unmount_api)
-
-
-async def _get_fuse_status(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: FUSE 挂载状态。
-    """
-    return await to_thread(api.fuse_status_api)
-
-
-async def _trigger_full_sync_db(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 全量同步数据库触发结果。
-    """
-    return await to_thread(api.trigger_full_sync_db_api)
-
-
-async def _check_life_event_status(api: Any, _: Dict) -> Any:
-    """
-    :param api: 插件 Api 实例。
-    :param _: 未使用参数。
-    :return: 生活事件线程状态与调试信息。
-    """
-    return await to_thread(api.check_life_event_status_api)
+    return await run_in_pool(api.fuse_mount_api, payload)
 
 
 async def _clear_recyclebin_internal(servicer: Any, _: Dict) -> Any:
@@ -263,7 +176,7 @@ async def _clear_recyclebin_internal(servicer: Any, _: Dict) -> Any:
     if not servicer or not servicer.client:
         return {"error": "115 客户端未初始化"}
     cleaner = Cleaner(servicer.client)
-    await to_thread(cleaner.clear_recyclebin)
+    await run_in_pool(cleaner.clear_recyclebin)
     return {"msg": "回收站已清空"}
 
 
@@ -278,7 +191,7 @@ async def _clear_receive_path_internal(servicer: Any, _: Dict) -> Any:
     if not servicer or not servicer.client:
         return {"error": "115 客户端未初始化"}
     cleaner = Cleaner(servicer.client)
-    await to_thread(cleaner.clear_receive_path)
+    await run_in_pool(cleaner.clear_receive_path)
     return {"msg": "最近接收已清空"}
 
 
@@ -466,3 +379,32 @@ INTERNAL_TOOLS.extend(
         },
     ]
 )
+
+# 无参数、直接调用 Api 方法的工具：工具名 -> Api 方法名
+_SIMPLE_TOOLS: Dict[str, str] = {
+    "get_plugin_status": "get_status_api",
+    "get_storage_status": "get_user_storage_status",
+    "trigger_full_sync": "trigger_full_sync_api",
+    "trigger_share_sync": "trigger_share_sync_api",
+    "clear_id_path_cache": "clear_id_path_cache_api",
+    "clear_increment_skip_cache": "clear_increment_skip_cache_api",
+    "fuse_unmount": "fuse_unmount_api",
+    "get_fuse_status": "fuse_status_api",
+    "trigger_full_sync_db": "trigger_full_sync_db_api",
+    "check_life_event_status": "check_life_event_status_api",
+}
+
+# 需要处理参数的工具：工具名 -> handler，模块加载时构建一次
+_HANDLERS: Dict[str, Callable[[Any, Dict], Awaitable[Any]]] = {
+    "browse_directory": _browse_directory,
+    "add_share_transfer": _add_share_transfer,
+    "manual_pan_transfer": _manual_pan_transfer,
+    "get_offline_tasks": _get_offline_tasks,
+    "add_offline_task": _add_offline_task,
+    "get_sync_delete_history": _get_sync_delete_history,
+    "fuse_mount": _fuse_mount,
+}
+
+_INTERNAL_HANDLERS: Dict[str, Callable[[Any, Dict], Awaitable[Any]]] = {
+    t["def"]["name"]: t["handler"] for t in INTERNAL_TOOLS
+}
@@ -25,6 +25,7 @@ class P115DiskPatcher:
     _original_upload: Optional[Callable[..., Any]] = None
     _patched_class: Optional[Any] = None
     _active: bool = False
+    _helper: Optional[P115DiskCore] = None
 
     @staticmethod
     def _patch_upload(
@@ -39,7 +40,10 @@ class P115DiskPatcher:
         client = getattr(self_instance, "client", None)
         if not client:
             return None
-        helper = P115DiskCore(client=client)
+        # 复用同一客户端的上传助手，保持 P115Center 的连接池与 P115Api 缓存
+        helper = P115DiskPatcher._helper
+        if helper is None or helper._p115_api.client is not client:
+            helper = P115DiskPatcher._helper = P115DiskCore(client=client)
         logger.debug("【P115Disk】调用补丁接口上传")
         return helper.upload(
             target_dir=target_dir, local_path=local_path, new_name=new_name
@@ -76,5 +80,8 @@ class P115DiskPatcher:
         cls._patched_class.upload = cls._original_upload
         cls._original_upload = None
         cls._patched_class = None
+        if cls._helper is not None:
+            cls._helper.stop()
+            cls._helper = None
         cls._active = False
         logger.info("【P115Disk】上传接口恢复原始状态成功")
@@ -1,4 +1,4 @@
-from re import search
+from re import compile as re_compile
 
 __all__ = [
     "PanPathNotFound",
@@ -12,6 +12,10 @@ __all__ = [
     "NotifyExceptionFormatter",
 ]
 
+_CODE_PATTERN = re_compile(r"\bcode=(\d+)")
+_REASON_PATTERN = re_compile(r"reason='([^']*)'")
+_MESSAGE_PATTERN = re_compile(r"message='([^']*)'")
+
 
 class NotifyExceptionFormatter:
     """
@@ -48,9 +52,13 @@ class NotifyExceptionFormatter:
         if not s:
             return type(e).__name__
 
-        code_m = search(r"\bcode=(\d+)", s)
-        reason_m = search(r"reason='([^']*)'", s)
-        msg_m = search(r"message='([^']*)'", s)
+        # 三个字段均为 key=value 形式，不含 "=" 时无需匹配
+        if "=" in s:
+            code_m = _CODE_PATTERN.search(s)
+            reason_m = _REASON_PATTERN.search(s)
+            msg_m = _MESSAGE_PATTERN.search(s)
+        else:
+            code_m = reason_m = msg_m = None
         if code_m or reason_m or msg_m:
             code = code_m.group(1) if code_m else None
             reason = reason_m.group(1) if reason_m else ""
@@ -2,7 +2,7 @@ __all__ = ["RateLimiter", "ApiEndpointCooldown"]
 
 from threading import Lock
 from time import monotonic, sleep
-from typing import Callable
+from typing import Callable, Optional
 
 
 class RateLimiter:
@@ -33,13 +33,45 @@ class RateLimiter:
 class ApiEndpointCooldown:
     """
     独立冷却时间和线程锁的 API 端点
+
+    冷却时间可自适应调整：触发限流时加倍（不超过上限），连续成功后逐步回落到初始值
     """
 
-    def __init__(self, api_callable: Callable, cooldown: float | int):
+    def __init__(
+        self,
+        api_callable: Callable,
+        cooldown: float | int,
+        max_cooldown: Optional[float] = None,
+    ):
         self.api_callable = api_callable
         self.cooldown = cooldown
+        self.base_cooldown = cooldown
+        self.max_cooldown = (
+            max_cooldown if max_cooldown is not None else max(cooldown * 4, 2.0)
+        )
         self.lock = Lock()
         self.last_call_time = monotonic() - cooldown
+        self._success_streak = 0
+
+    def backoff(self):
+        """
+        触发限流后加倍冷却时间
+        """
+        with self.lock:
+            self.cooldown = min(max(self.cooldown * 2, 0.25), self.max_cooldown)
+            self._success_streak = 0
+
+    def record_success(self):
+        """
+        记录一次成功调用，连续成功 10 次后冷却时间减半，最低回落到初始值
+        """
+        with self.lock:
+            if self.cooldown <= self.base_cooldown:
+                return
+            self._success_streak += 1
+            if self._success_streak >= 10:
+                self._success_streak = 0
+                self.cooldown = max(self.cooldown * 0.5, self.base_cooldown)
 
     def __call__(self, payload: dict) -> dict:
         """
@@ -1,10 +1,44 @@
-from random import randint, choice
+from random import randrange
+from typing import Tuple
 
 from p115client import P115Client, check_response
 
 from app.core.cache import cached
 
 
+# 常见 iOS 版本
+_IOS_VERSIONS = (
+    "15_0",
+    "15_1",
+    "15_2",
+    "15_3",
+    "15_4",
+    "15_5",
+    "15_6",
+    "15_7",
+    "15_8",
+    "16_0",
+    "16_1",
+    "16_2",
+    "16_3",
+    "16_4",
+    "16_5",
+    "16_6",
+    "16_7",
+    "17_0",
+    "17_1",
+    "17_2",
+    "17_3",
+    "17_4",
+    "17_5",
+    "18_0",
+    "18_1",
+)
+
+# 随机组合总数：build 数字(15～21) × build 字母 × build 尾号(100～999) × iOS 版本 × 客户端
+_U115_IOS_VARIANTS = 7 * 5 * 900 * len(_IOS_VERSIONS) * 2
+
+
 class UserAgentUtils:
     """
     User-Agent 生成工具
@@ -12,17 +46,15 @@ class UserAgentUtils:
 
     @staticmethod
     @cached(
-        region="p115strmhelper_util_user_agent_u115_ios", ttl=60 * 60, skip_none=True
+        region="p115strmhelper_util_user_agent_u115_app_versions",
+        ttl=60 * 60,
+        skip_none=True,
     )
-    def generate_u115_ios() -> str:
+    def get_u115_app_versions() -> Tuple[str, str]:
         """
-        各段含义与生成规则：
-
-        - iOS 版本：iPhone OS {major}_{minor}，从常见版本中随机（如 15_0～18_1）
-        - Build：Mobile/{build}，Apple 风格 build 号（数字+字母+3 位数字，如 15E148、21A258）
-        - AppleWebKit：与 iOS 大版本对应的 WebKit 版本（如 605.1.15）
+        获取 UDown 与 115网盘 iOS 客户端的最新版本号，获取失败时使用内置版本号
 
-        :return: 完整的 User-Agent 字符串
+        :return: (UDown 版本号, 115网盘版本号)
         """
         try:
             resp = P115Client.app_version_list2()
@@ -32,44 +64,34 @@ class UserAgentUtils:
         except Exception:
             udown_version = "37.0.7"
             wangpan_version = "36.2.20"
-        ios_versions = [
-            "15_0",
-            "15_1",
-            "15_2",
-            "15_3",
-            "15_4",
-            "15_5",
-            "15_6",
-            "15_7",
-            "15_8",
-            "16_0",
-            "16_1",
-            "16_2",
-            "16_3",
-            "16_4",
-            "16_5",
-            "16_6",
-            "16_7",
-            "17_0",
-            "17_1",
-            "17_2",
-            "17_3",
-            "17_4",
-            "17_5",
-            "18_0",
-            "18_1",
-        ]
-        build_num = randint(15, 21)
-        build_letter = choice("ABCDE")
-        build_tail = randint(100, 999)
-        build = f"{build_num}{build_letter}{build_tail}"
+        return udown_version, wangpan_version
+
+    @staticmethod
+    def generate_u115_ios() -> str:
+        """
+        各段含义与生成规则：
+
+        - iOS 版本：iPhone OS {major}_{minor}，从常见版本中随机（如 15_0～18_1）
+        - Build：Mobile/{build}，Apple 风格 build 号（数字+字母+3 位数字，如 15E148、21A258）
+        - AppleWebKit：与 iOS 大版本对应的 WebKit 版本（如 605.1.15）
+
+        客户端版本号缓存 1 小时，其余部分每次调用随机生成
+
+        :return: 完整的 User-Agent 字符串
+        """
+        udown_version, wangpan_version = UserAgentUtils.get_u115_app_versions()
+        # 一次取随机数，再逐段拆分出各部分，分布与逐项独立随机一致
+        r, build_num = divmod(randrange(_U115_IOS_VARIANTS), 7)
+        r, build_letter = divmod(r, 5)
+        r, build_tail = divmod(r, 900)
+        use_udown, os_index = divmod(r, len(_IOS_VERSIONS))
+        build = f"{build_num + 15}{'ABCDE'[build_letter]}{build_tail + 100}"
         webkit = "605.1.15"
-        os_ver = choice(ios_versions)
-        client = choice(
-            [
-                f"115wangpan_ios/{wangpan_version}",
-                f"UDown/{udown_version}",
-            ]
+        os_ver = _IOS_VERSIONS[os_index]
+        client = (
+            f"UDown/{udown_version}"
+            if use_udown
+            else f"115wangpan_ios/{wangpan_version}"
         )
         return (
             f"Mozilla/5.0 (iPhone; CPU iPhone OS {os_ver} like Mac OS X) "